@@ -1,9 +1,37 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+class DomainTrie:
+    """
+    A reverse-label trie for domain suffix matching.
+    Labels are stored in reverse order ('news.bbc.co.uk' walks uk -> co -> bbc),
+    so a lookup is O(labels in the host) regardless of allowlist size, and an
+    allowlisted domain automatically matches all of its subdomains.
+    """
+    def __init__(self):
+        self._root = {}
+
+    def insert(self, domain: str, category: str):
+        node = self._root
+        for label in reversed(domain.lower().split('.')):
+            node = node.setdefault(label, {})
+        node[''] = category  # Terminal marker carrying the allowlist category
+
+    def match(self, host: str) -> str | None:
+        """Returns the category for the host (or a parent domain), else None."""
+        node = self._root
+        for label in reversed(host.lower().split('.')):
+            node = node.get(label)
+            if node is None:
+                return None
+            if '' in node:
+                return node['']
+        return None
+
 class Config:
     # API Keys
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -126,4 +154,32 @@ class Config:
         "bloomberg.com", "reuters.com", "financial-times.com", "economist.com",
         "cnbc.com", "marketwatch.com", "seeking-alpha.com", "motleyfool.com",
         "yahoofinance.com", "nasdaq.com", "sec.gov", "crunchbase.com"
-    }
\ No newline at end of file
+    }
+
+# The three allowlists overlap (e.g. 'reuters.com' is both news and
+# tech/science). Dedupe them once at import into a single frozen union plus a
+# category lookup; first category listed wins for overlapping domains.
+_DOMAIN_CATEGORY = {d: "tech_science" for d in Config.TRUSTED_TECH_SCIENCE}
+_DOMAIN_CATEGORY.update({d: "encyclopedia" for d in Config.TRUSTED_ENCYCLOPEDIAS})
+_DOMAIN_CATEGORY.update({d: "news" for d in Config.TRUSTED_NEWS_DOMAINS})
+
+ALL_TRUSTED_DOMAINS = frozenset(_DOMAIN_CATEGORY)
+
+# Build the trie once at import time from the deduplicated union. Category
+# names map to SourceTypes in research/source_filter.py.
+TRUSTED_TRIE = DomainTrie()
+for _domain, _category in _DOMAIN_CATEGORY.items():
+    TRUSTED_TRIE.insert(_domain, _category)
+
+@lru_cache(maxsize=4096)
+def match_trusted_domain(host: str) -> str | None:
+    """Cached trie lookup: hostname -> allowlist category (or None)."""
+    return TRUSTED_TRIE.match(host)
+
+def is_trusted(host: str) -> bool:
+    """True if the host (or a parent domain) is on any allowlist."""
+    return match_trusted_domain(host) is not None
+
+def category_of(host: str) -> str | None:
+    """Allowlist category for the host: 'news', 'encyclopedia' or 'tech_science'."""
+    return match_trusted_domain(host)
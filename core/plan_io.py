@@ -0,0 +1,56 @@
+import os
+import orjson
+
+"""
+I/O helpers for visual plan files.
+
+Plans are stored as newline-delimited JSON (one VisualPlan dict per line) so
+the director can checkpoint each finished segment with a single O(1) append
+instead of rewriting the whole file. Legacy array-form files are still
+readable and get migrated on the next full rewrite.
+"""
+
+def read_plan(path: str) -> list[dict]:
+    """
+    Reads a plan file in either JSONL (current) or legacy array form.
+    A truncated trailing line (crash mid-append) is silently dropped.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    stripped = raw.lstrip()
+    if not stripped:
+        return []
+
+    # Legacy format: a single pretty-printed JSON array
+    if stripped[:1] == b'[':
+        return orjson.loads(raw)
+
+    items = []
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            # Torn tail from an interrupted append; everything before it is good
+            break
+    return items
+
+def rewrite_plan(path: str, items: list[dict]):
+    """Atomically rewrites the whole plan file in JSONL form."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for item in items:
+            f.write(orjson.dumps(item))
+            f.write(b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def append_plan(f, item: dict):
+    """Appends one plan entry to an open binary file and forces it to disk."""
+    f.write(orjson.dumps(item))
+    f.write(b"\n")
+    f.flush()
+    os.fsync(f.fileno())
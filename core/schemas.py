@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, HttpUrl, validator
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter, validator
 from typing import List, Optional
 from datetime import date
 from enum import Enum
@@ -93,4 +93,16 @@ class VisualPlan(BaseModel):
     Contains multiple shots for that segment.
     """
     segment_order: int
-    shots: List[VisualShot]
\ No newline at end of file
+    shots: List[VisualShot]
+
+# --- Precompiled Validators ---
+# Built once at import so hot loops (fact extraction) batch-validate in
+# pydantic-core instead of constructing models one by one.
+EVIDENCE_LIST_ADAPTER = TypeAdapter(List[EvidenceItem])
+
+# Warm the core schemas at import: the first validation otherwise pays the
+# full schema build (noticeable as first-click latency in the dashboard).
+EvidenceItem.model_rebuild()
+EvidenceBundle.model_rebuild()
+FullScript.model_rebuild()
+VisualPlan.model_rebuild()
\ No newline at end of file
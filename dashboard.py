@@ -1,23 +1,39 @@
 import streamlit as st
-import json
 import os
-import glob
 from ddgs import DDGS
+from core.plan_io import read_plan, rewrite_plan
 from core.schemas import FullScript
 
 st.set_page_config(page_title="Evidence-First Director", layout="wide")
 
 # --- SMART FILE LOADER ---
-def get_available_scripts():
-    # Look for script_*.json in root and output/ folders
-    files = glob.glob("script_*.json") + glob.glob("output/script_*.json")
+@st.cache_data(ttl=5, show_spinner=False)
+def get_available_scripts(dir_sig: float):
+    # dir_sig (parent dir mtimes) busts the cache as soon as files change;
+    # the ttl covers in-place edits that don't touch the directory entry.
+    # Single scandir pass per folder: the DirEntry carries the stat info, so
+    # no extra stat per file for the mtime sort.
+    entries = []
+    for d in ('.', 'output'):
+        if not os.path.isdir(d):
+            continue
+        for e in os.scandir(d):
+            if e.name.startswith('script_') and e.name.endswith('.json'):
+                path = e.name if d == '.' else f'{d}/{e.name}'
+                entries.append((path, e.stat().st_mtime))
     # Sort by newest first
-    files.sort(key=os.path.getmtime, reverse=True)
-    return files
+    entries.sort(key=lambda t: -t[1])
+    return [path for path, _ in entries]
+
+def _scripts_dir_signature() -> float:
+    sig = os.path.getmtime('.')
+    if os.path.isdir('output'):
+        sig += os.path.getmtime('output')
+    return sig
 
 # --- SIDEBAR SELECTOR ---
 st.sidebar.title("🗄️ Project Loader")
-script_files = get_available_scripts()
+script_files = get_available_scripts(_scripts_dir_signature())
 
 if not script_files:
     st.error("❌ No 'script_*.json' files found in root or output/ folders.")
@@ -37,32 +53,30 @@ else:
     st.sidebar.warning(f"⚠️ Visual Plan missing\n(Expected: {visual_plan_file})")
 
 # --- LOADERS ---
-def load_data(script_path, plan_path):
-    """Loads the script and visual plan with encoding fallback."""
+@st.cache_data(show_spinner=False)
+def load_data(script_path, plan_path, script_mtime, plan_mtime):
+    """Loads the script and visual plan with encoding fallback.
+
+    The mtime arguments are cache keys only: switching back and forth
+    between scripts hits memory instead of re-reading and re-validating,
+    while an edited file (new mtime) still reloads.
+    """
     script = None
     visual_plan = []
 
     # 1. Load Script
     try:
-        try:
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script = FullScript(**json.load(f))
-        except UnicodeDecodeError:
-            with open(script_path, 'r', encoding='cp1252') as f:
-                script = FullScript(**json.load(f))
+        with open(script_path, 'rb') as f:
+            # Straight to pydantic-core: skips the Python dict round-trip
+            script = FullScript.model_validate_json(f.read())
     except Exception as e:
         st.error(f"Failed to load script: {e}")
         return None, None
 
-    # 2. Load Visual Plan (if exists)
+    # 2. Load Visual Plan (if exists; handles both JSONL and legacy array form)
     if os.path.exists(plan_path):
         try:
-            try:
-                with open(plan_path, 'r', encoding='utf-8') as f:
-                    visual_plan = json.load(f)
-            except UnicodeDecodeError:
-                with open(plan_path, 'r', encoding='cp1252') as f:
-                    visual_plan = json.load(f)
+            visual_plan = read_plan(plan_path)
         except Exception as e:
             st.warning(f"Failed to parse visual plan: {e}")
 
@@ -75,22 +89,25 @@ def save_data(script, visual_plan, script_path, plan_path):
         with open(script_path, 'w', encoding='utf-8') as f:
             f.write(script.model_dump_json(indent=2))
         
-        # Save Visual Plan
+        # Save Visual Plan (atomic JSONL rewrite)
         if visual_plan:
-            with open(plan_path, 'w', encoding='utf-8') as f:
-                json.dump(visual_plan, f, indent=2)
+            rewrite_plan(plan_path, visual_plan)
         
         st.toast(f"✅ Saved to {script_path}")
     except Exception as e:
         st.error(f"Save failed: {e}")
 
 # --- UTILS ---
+# One shared client: DDGS keeps an httpx.Client alive internally, so reusing
+# it avoids a TLS handshake per preview.
+_ddgs = DDGS()
+
+@st.cache_data(ttl=600, show_spinner=False)
 def search_preview(query):
-    """Performs a live DuckDuckGo image search."""
+    """Performs a live DuckDuckGo image search (cached for 10 minutes)."""
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.images(query, max_results=3))
-            return [r['thumbnail'] for r in results]
+        results = list(_ddgs.images(query, max_results=3))
+        return [r['thumbnail'] for r in results]
     except Exception:
         return []
 
@@ -99,7 +116,12 @@ st.title("🎬 Evidence-First: Director's Desk")
 
 # Initialize Session State when File Changes
 if "current_file" not in st.session_state or st.session_state["current_file"] != selected_file:
-    script, v_plan = load_data(selected_file, visual_plan_file)
+    script, v_plan = load_data(
+        selected_file,
+        visual_plan_file,
+        os.path.getmtime(selected_file),
+        os.path.getmtime(visual_plan_file) if os.path.exists(visual_plan_file) else 0,
+    )
     if script:
         st.session_state["script"] = script
         st.session_state["visual_plan"] = v_plan
@@ -119,14 +141,15 @@ with st.expander("📄 Script Metadata (Title, Sources)", expanded=False):
 
 st.markdown("---")
 
+# Index the visual plan once: O(1) lookups per segment instead of a linear
+# scan for every segment on every rerun
+plan_by_order = {p.get("segment_order"): p for p in (visual_plan or [])}
+
 # Iterate through Segments
 for i, segment in enumerate(script.segments):
-    
+
     # Match Visual Plan Segment
-    # Handle case where visual_plan is empty or None
-    seg_plan = None
-    if visual_plan:
-        seg_plan = next((p for p in visual_plan if p.get("segment_order") == segment.segment_order), None)
+    seg_plan = plan_by_order.get(segment.segment_order)
 
     with st.container():
         col1, col2 = st.columns([1, 1])
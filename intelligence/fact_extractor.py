@@ -1,73 +1,162 @@
-import json
-import hashlib
-from typing import List
-from .llm_client import GeminiClient
-from core.schemas import EvidenceItem, SourceType
-
-class FactExtractor:
-    def __init__(self):
-        self.client = GeminiClient(model_name="gemini-2.5-flash-lite")
-
-    def _generate_id(self, text: str) -> str:
-        """Creates a deterministic hash for the claim ID."""
-        return hashlib.md5(text.encode()).hexdigest()[:12]
-
-    def extract_from_text(self, raw_text: str, url: str, source_type: SourceType) -> List[EvidenceItem]:
-        """
-        Analyzes raw text and returns a list of validated EvidenceItems.
-        """
-        
-        system_prompt = f"""
-        ROLE: You are a strict Fact Extraction Engine.
-        INPUT: A raw text snippet from a website ({url}).
-        
-        TASK:
-        1. Extract specific, atomic factual claims.
-        2. IGNORE opinions, marketing, emotional language, or vague statements.
-        3. IGNORE navigation text, footers, or irrelevant web UI text.
-        4. If a claim involves numbers (dates, statistics), extract them exactly.
-        5. Assign a confidence score (0.0 to 1.0) based on how objective the claim is.
-        
-        OUTPUT FORMAT:
-        Return a valid JSON list of objects. Each object must have:
-        - "claim": string (The fact)
-        - "confidence": float
-        
-        RAW TEXT TO PROCESS:
-        {raw_text[:10000]}  # Truncate to avoid token limits if necessary
-        """
-
-        try:
-            # 1. Call LLM
-            response_json = self.client.generate_json(system_prompt)
-            data = json.loads(response_json)
-            
-            # 2. Convert to Pydantic Models (Validation happens here)
-            evidence_list = []
-            
-            # Handle case where LLM returns a dict instead of list
-            if isinstance(data, dict):
-                # Sometimes Gemini wraps list in a key like "claims"
-                data = data.get("claims", [])
-
-            for item in data:
-                # We strictly validate against the schema you built earlier
-                try:
-                    ev = EvidenceItem(
-                        id=self._generate_id(item['claim']),
-                        claim=item['claim'],
-                        source_url=url,
-                        source_type=source_type,
-                        confidence=item['confidence'],
-                        source_count=1  # Default for single extraction
-                    )
-                    evidence_list.append(ev)
-                except Exception as e:
-                    print(f"Validation Error for claim '{item.get('claim')}': {e}")
-                    continue
-
-            return evidence_list
-
-        except Exception as e:
-            print(f"Extraction failed for {url}: {e}")
-            return []
\ No newline at end of file
+import io
+import ijson
+import orjson
+import string
+import asyncio
+import hashlib
+from datetime import date
+from functools import lru_cache
+from typing import List, Tuple
+from .llm_client import GeminiClient
+from core.schemas import EvidenceItem, SourceType, EVIDENCE_LIST_ADAPTER
+
+@lru_cache(maxsize=100000)
+def _claim_id(text: str) -> str:
+    """Creates a deterministic hash for the claim ID.
+
+    BLAKE2b is faster than MD5 for short strings, and the cache means
+    identical claims seen across multiple URLs are only hashed once.
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=6).hexdigest()
+
+# Compiled once; only the URL and the text body vary per call
+_PROMPT_TMPL = string.Template("""
+ROLE: You are a strict Fact Extraction Engine.
+INPUT: A raw text snippet from a website ($url).
+
+TASK:
+1. Extract specific, atomic factual claims.
+2. IGNORE opinions, marketing, emotional language, or vague statements.
+3. IGNORE navigation text, footers, or irrelevant web UI text.
+4. If a claim involves numbers (dates, statistics), extract them exactly.
+5. Assign a confidence score (0.0 to 1.0) based on how objective the claim is.
+
+OUTPUT FORMAT:
+Return a valid JSON list of objects. Each object must have:
+- "claim": string (The fact)
+- "confidence": float
+
+RAW TEXT TO PROCESS:
+$body""")
+
+# Model limits are in tokens, which track bytes far better than characters
+# for non-ASCII text. 8000 UTF-8 bytes keeps us safely under budget.
+_MAX_BODY_BYTES = 8000
+
+def _truncate_utf8(text: str, limit: int = _MAX_BODY_BYTES) -> str:
+    """Truncates to a UTF-8 byte budget without splitting a multibyte char."""
+    encoded = text.encode('utf-8')
+    if len(encoded) <= limit:
+        return text
+    return encoded[:limit].decode('utf-8', errors='ignore')
+
+class FactExtractor:
+    # Cap on in-flight LLM calls when extracting many URLs at once
+    MAX_CONCURRENCY = 15
+
+    def __init__(self):
+        self.client = GeminiClient(model_name="gemini-2.5-flash-lite")
+
+    def _build_prompt(self, raw_text: str, url: str) -> str:
+        return _PROMPT_TMPL.substitute(url=url, body=_truncate_utf8(raw_text))
+
+    @staticmethod
+    def _iter_claims(raw: bytes):
+        """
+        Streams claim objects out of the LLM response one at a time instead
+        of materializing the full parse tree first. Handles both a bare list
+        and the occasional {"claims": [...]} wrapper Gemini produces.
+        """
+        for prefix in ('item', 'claims.item'):
+            found = False
+            for obj in ijson.items(io.BytesIO(raw), prefix):
+                found = True
+                yield obj
+            if found:
+                return
+
+    def _parse_response(self, response_json: str, url: str, source_type: SourceType) -> List[EvidenceItem]:
+        """Parses the LLM response and returns validated EvidenceItems."""
+
+        # Hoisted once per response: the default_factory would otherwise call
+        # date.today() for every single claim
+        today = date.today()
+
+        def build_rows(items):
+            return [
+                {
+                    'id': _claim_id(item['claim']),
+                    'claim': item['claim'],
+                    'source_url': url,
+                    'source_type': source_type,
+                    'retrieved_at': today,
+                    'confidence': item['confidence'],
+                    'source_count': 1,  # Default for single extraction
+                }
+                for item in items
+                # Guard every field touched above: one claim missing its
+                # confidence (or with a non-string claim) must skip just
+                # that row, not throw past the salvage loop below and zero
+                # out the whole response
+                if isinstance(item, dict)
+                and isinstance(item.get('claim'), str)
+                and 'confidence' in item
+            ]
+
+        try:
+            rows = build_rows(self._iter_claims(response_json.encode('utf-8')))
+        except ijson.common.IncompleteJSONError:
+            # Malformed stream; fall back to a strict whole-document parse
+            data = orjson.loads(response_json)
+            if isinstance(data, dict):
+                data = data.get("claims", [])
+            rows = build_rows(data)
+
+        try:
+            # One-shot validation of the whole batch in pydantic-core
+            return EVIDENCE_LIST_ADAPTER.validate_python(rows)
+        except Exception:
+            # Some row is bad; salvage the valid ones individually
+            evidence_list = []
+            for row in rows:
+                try:
+                    evidence_list.append(EvidenceItem(**row))
+                except Exception as e:
+                    print(f"Validation Error for claim '{row.get('claim')}': {e}")
+                    continue
+            return evidence_list
+
+    def extract_from_text(self, raw_text: str, url: str, source_type: SourceType) -> List[EvidenceItem]:
+        """
+        Analyzes raw text and returns a list of validated EvidenceItems.
+        """
+        try:
+            response_json = self.client.generate_json(self._build_prompt(raw_text, url))
+            return self._parse_response(response_json, url, source_type)
+        except Exception as e:
+            print(f"Extraction failed for {url}: {e}")
+            return []
+
+    async def _extract_one_async(self, raw_text: str, url: str, source_type: SourceType,
+                                 sem: asyncio.Semaphore) -> List[EvidenceItem]:
+        async with sem:
+            try:
+                response_json = await self.client.generate_json_async(
+                    self._build_prompt(raw_text, url)
+                )
+                return self._parse_response(response_json, url, source_type)
+            except Exception as e:
+                print(f"Extraction failed for {url}: {e}")
+                return []
+
+    async def extract_many(self, docs: List[Tuple[str, str, SourceType]]) -> List[EvidenceItem]:
+        """
+        Extracts facts from many (raw_text, url, source_type) docs concurrently.
+        The semaphore caps in-flight requests; the client's token bucket keeps
+        the aggregate rate within the per-minute quota.
+        """
+        sem = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        results = await asyncio.gather(
+            *[self._extract_one_async(text, url, st, sem) for text, url, st in docs]
+        )
+        return [item for batch in results for item in batch]
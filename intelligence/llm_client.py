@@ -1,39 +1,82 @@
-import os
 import time
 import random
+import asyncio
+import threading
+from functools import lru_cache
 from google import genai
 from google.genai import types
-from dotenv import load_dotenv
+from core.config import Config
 
-load_dotenv()
-
-API_KEY = os.getenv("GEMINI_API_KEY")
+# Config already ran load_dotenv() once at import; re-reading .env here would
+# just parse the same file a second time per process start.
+API_KEY = Config.GEMINI_API_KEY
 if not API_KEY:
     raise ValueError("GEMINI_API_KEY not found in .env file")
 
-class GeminiClient:
-    # CLASS-LEVEL VARIABLES
-    # These are shared across all instances of GeminiClient to enforce a global limit
-    _last_call_time = 0
-    _min_interval = 4.0  # Force 4 seconds between EVERY call (15 requests/min max)
+@lru_cache(maxsize=8)
+def _get_raw_client(api_key: str) -> genai.Client:
+    """
+    One genai.Client per API key, shared by every GeminiClient instance.
+    Constructing the client bootstraps TLS/auth and an httpx pool, so reusing
+    it keeps connections alive across FactExtractor/ScriptWriter instances.
+    """
+    return genai.Client(api_key=api_key)
+
+class _TokenBucket:
+    """
+    Thread-safe token bucket. The API quota is per-minute, not per-request,
+    so this allows bursts up to the RPM budget instead of forcing a fixed
+    gap between every call.
+    """
+    def __init__(self, rate: int, per: float):
+        self.rate = rate          # Tokens added per 'per' seconds
+        self.per = per
+        self.tokens = float(rate) # Start full so the first burst is free
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
 
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    float(self.rate),
+                    self.tokens + (now - self.updated) * (self.rate / self.per)
+                )
+                self.updated = now
+
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+
+                # Time until the next token drips in
+                wait_time = (1.0 - self.tokens) * (self.per / self.rate)
+            time.sleep(wait_time)
+
+# Shared across all instances to enforce a process-wide limit (15 RPM)
+_BUCKET = _TokenBucket(rate=15, per=60.0)
+
+# Error-message markers worth retrying. Anything else (400/401/403,
+# programming bugs) is raised immediately instead of burning retries.
+_RETRY_MARKERS = frozenset({'429', 'resource', 'quota', 'unavailable', '503'})
+
+def _is_retryable(error: Exception) -> bool:
+    msg = str(error).lower()
+    return any(marker in msg for marker in _RETRY_MARKERS)
+
+class GeminiClient:
     def __init__(self, model_name="gemini-2.0-flash"):
-        self.client = genai.Client(api_key=API_KEY)
+        self.client = _get_raw_client(API_KEY)
         self.model_name = model_name
 
     def _wait_for_slot(self):
         """
         Proactive Rate Limiting:
-        Ensures we never call the API faster than _min_interval.
+        Takes a token from the shared bucket, sleeping only when the
+        per-minute budget is actually exhausted.
         """
-        current_time = time.time()
-        elapsed = current_time - GeminiClient._last_call_time
-        
-        if elapsed < GeminiClient._min_interval:
-            wait_time = GeminiClient._min_interval - elapsed
-            time.sleep(wait_time)
-            
-        GeminiClient._last_call_time = time.time()
+        _BUCKET.acquire()
 
     def _retry_on_limit(func):
         """
@@ -54,8 +97,7 @@ class GeminiClient:
                     
                 except Exception as e:
                     # 3. Reactive Wait (If we hit the limit anyway)
-                    error_str = str(e).lower()
-                    if "429" in error_str or "resource" in error_str or "quota" in error_str:
+                    if _is_retryable(e):
                         jitter = random.uniform(0, 2) # Randomness prevents "Thundering Herd"
                         wait_time = delay + jitter
                         print(f"      ⚠️ Rate limit hit (Attempt {attempt+1}/{retries}). Cooling down for {wait_time:.1f}s...")
@@ -80,6 +122,42 @@ class GeminiClient:
         )
         return response.text
 
+    async def generate_json_async(self, prompt: str) -> str:
+        """
+        Async variant of generate_json using the native genai async client.
+        Lets callers overlap many independent requests (bounded by the
+        shared token bucket) instead of stacking LLM round-trips serially.
+        """
+        retries = 5
+        delay = 10
+
+        for attempt in range(retries):
+            try:
+                # Proactive wait runs in a thread so it doesn't block the loop
+                await asyncio.to_thread(self._wait_for_slot)
+
+                response = await self.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json"
+                    )
+                )
+                return response.text
+
+            except Exception as e:
+                if _is_retryable(e):
+                    jitter = random.uniform(0, 2)
+                    wait_time = delay + jitter
+                    print(f"      ⚠️ Rate limit hit (Attempt {attempt+1}/{retries}). Cooling down for {wait_time:.1f}s...")
+
+                    await asyncio.sleep(wait_time)
+                    delay *= 2
+                else:
+                    raise e
+
+        raise Exception("CRITICAL: Max retries exceeded. API is fully saturated.")
+
     @_retry_on_limit
     def generate_text(self, prompt: str) -> str:
         """Generates standard text content."""
@@ -1,4 +1,4 @@
-import json
+import orjson
 from .llm_client import GeminiClient
 from core.schemas import EvidenceBundle, FullScript
 
@@ -11,8 +11,12 @@ class ScriptWriter:
         """
         Generates a video script based strictly on the provided EvidenceBundle.
         """
-        # Dump the Pydantic model to JSON to feed it to the LLM
-        evidence_json = evidence_bundle.model_dump_json()
+        # Dump the Pydantic model to JSON to feed it to the LLM.
+        # Bookkeeping fields are excluded: the LLM doesn't need them and they
+        # cost tokens on every script generation.
+        evidence_json = evidence_bundle.model_dump_json(
+            exclude={'rejected_claims_count', 'processing_timestamp'}
+        )
 
         system_prompt = f"""
 ROLE: You are an elite YouTube documentarian (think Vox, Johnny Harris, Veritasium).
@@ -119,9 +123,10 @@ REMEMBER:
 """
 
         try:
-            full_prompt = f"{system_prompt}\n\nEVIDENCE DATA:\n{evidence_json}"
+            # Single join instead of an f-string copy of both large parts
+            full_prompt = "".join((system_prompt, "\n\nEVIDENCE DATA:\n", evidence_json))
             raw_json = self.client.generate_json(full_prompt)
-            data = json.loads(raw_json)
+            data = orjson.loads(raw_json)
 
             # Ensure topic consistency
             if "topic" not in data:
@@ -138,7 +143,7 @@ REMEMBER:
             script_obj = FullScript(**data)
             return script_obj
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             print(f"Script generation failed: Invalid JSON response from LLM: {e}")
             raise
         except Exception as e:
@@ -1,139 +1,292 @@
-import json
-import os
-import time
-from intelligence.llm_client import LLM_Client
-from core.schemas import FullScript, VisualPlan, VisualShot
-
-class VisualDirector:
-    def __init__(self):
-        self.llm = LLM_Client()
-
-    def plan_visuals(self, script: FullScript, output_path: str) -> list[VisualPlan]:
-        print(f"🎬  Directing Visuals for: {script.title}...")
-        
-        # 1. LOAD PARTIAL PROGRESS (Smart Resume)
-        final_plans = []
-        if os.path.exists(output_path):
-            try:
-                with open(output_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    final_plans = [VisualPlan(**item) for item in data]
-                print(f"    👉 Found {len(final_plans)} segments already planned. Resuming...")
-            except Exception as e:
-                print(f"    ⚠️ Could not load existing plan: {e}. Starting fresh.")
-                final_plans = []
-
-        completed_ids = {p.segment_order for p in final_plans}
-
-        # 2. LOOP THROUGH SEGMENTS
-        for segment in script.segments:
-            if segment.segment_order in completed_ids:
-                continue
-
-            print(f"    👉 Planning Segment {segment.segment_order}...")
-            time.sleep(2.0) # Rate limit protection
-
-            # Context Memory
-            last_visual = "None"
-            if final_plans and final_plans[-1].shots:
-                last_visual = final_plans[-1].shots[-1].visual_query
-
-            prompt = f"""
-            ROLE:
-You are a Senior Documentary Visual Director responsible for visual accuracy, emotional pacing, and viewer trust.
-
-CONTEXT:
-- The input is factual narration from a documentary.
-- Viewers may assume visuals are real unless clearly symbolic.
-- Visual misuse harms credibility.
-
-PREVIOUS SHOT:
-{last_visual}
-
-INPUT NARRATION:
-"{segment.narration_text}"
-
-YOUR TASK (STRICT ORDER):
-
-STEP 1 — SENTENCE ATOMIZATION
-- Split the narration into atomic ideas.
-- One idea = one shot.
-- Never combine unrelated ideas.
-
-STEP 2 — INTENT CLASSIFICATION (INTERNAL)
-For each idea, determine ONE dominant intent:
-- factual_event
-- historical_reference
-- personal_actor
-- emotional_atmosphere
-- abstract_system
-- future_projection
-- data_or_process
-
-STEP 3 — REALITY REQUIREMENT
-Decide:
-- Must this visual be REAL and verifiable?
-- Can it be SYMBOLIC without misleading?
-
-STEP 4 — SOURCE SELECTION (STRICT)
-Choose ONE source per shot:
-
-- web:
-  Use ONLY if the idea refers to a real-world event, protest, conflict, document, or incident.
-- wikimedia:
-  Use ONLY for recognizable people, institutions, or landmarks.
-- pexels:
-  Use ONLY for non-specific emotion, environment, or pacing shots.
-- flux:
-  Use ONLY for abstract concepts, data metaphors, or future scenarios.
-
-NEVER:
-- Use stock footage for named events.
-- Use AI for real people or historical moments.
-- Use literal imagery for abstract systems.
-
-STEP 5 — QUERY DESIGN
-- Queries must be concise, descriptive, and unambiguous.
-- Include location only if contextually required.
-- Prefer neutral, journalistic phrasing.
-
-OUTPUT FORMAT (JSON ONLY):
-[
-  {{
-    "visual_query": "...",
-    "visual_type": "archive | emotional | scenic | data",
-    "visual_source": "web | wikimedia | pexels | flux"
-  }}
-]
-
-QUALITY RULES:
-- Every shot must be defensible in an editorial review.
-- If unsure, choose abstraction over misinformation.
-
-            """
-            
-            try:
-                response_text = self.llm.generate_json(prompt)
-                clean_json = response_text.replace("```json", "").replace("```", "")
-                shot_data = json.loads(clean_json)
-                
-                valid_shots = []
-                for s in shot_data:
-                    valid_shots.append(VisualShot(
-                        visual_query=s.get("visual_query", "abstract background"),
-                        visual_type=s.get("visual_type", "scenic"),
-                        visual_source=s.get("visual_source", "pexels")
-                    ))
-                
-                new_plan = VisualPlan(segment_order=segment.segment_order, shots=valid_shots)
-                final_plans.append(new_plan)
-
-                with open(output_path, "w", encoding="utf-8") as f:
-                    json.dump([p.model_dump() for p in final_plans], f, indent=2)
-                
-            except Exception as e:
-                print(f"    ❌ Error directing segment {segment.segment_order}: {e}")
-                print("    ⚠️ Saving progress. Run pipeline again to resume.")
-                raise e
-
-        return final_plans
\ No newline at end of file
+import hashlib
+import os
+import orjson
+import re
+import string
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from intelligence.llm_client import LLM_Client
+from core.plan_io import read_plan, rewrite_plan, append_plan
+from core.schemas import FullScript, VisualPlan, VisualShot
+
+# Bump when the prompt changes materially: stale cached shot lists for the
+# old prompt must not be replayed against the new one
+_PROMPT_VERSION = 1
+
+# Anchored fence stripper: one pass, and backticks inside shot descriptions
+# survive (the old double str.replace would eat them)
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.S)
+
+# The ~60-line prompt body is constant; building it per call re-concatenated
+# ~30 substrings each time. Template it once at import and substitute the
+# two variable fields (string.Template also spares the doubled-brace escapes
+# an f-string needs around the JSON example).
+_PROMPT_TMPL = string.Template("""
+        ROLE:
+You are a Senior Documentary Visual Director responsible for visual accuracy, emotional pacing, and viewer trust.
+
+CONTEXT:
+- The input is factual narration from a documentary.
+- Viewers may assume visuals are real unless clearly symbolic.
+- Visual misuse harms credibility.
+
+PREVIOUS SHOT (before the first segment below):
+$last_visual
+
+SEGMENTS:
+$segment_block
+
+YOUR TASK (STRICT ORDER, APPLIED TO EACH SEGMENT INDEPENDENTLY):
+
+STEP 1 — SENTENCE ATOMIZATION
+- Split the narration into atomic ideas.
+- One idea = one shot.
+- Never combine unrelated ideas.
+
+STEP 2 — INTENT CLASSIFICATION (INTERNAL)
+For each idea, determine ONE dominant intent:
+- factual_event
+- historical_reference
+- personal_actor
+- emotional_atmosphere
+- abstract_system
+- future_projection
+- data_or_process
+
+STEP 3 — REALITY REQUIREMENT
+Decide:
+- Must this visual be REAL and verifiable?
+- Can it be SYMBOLIC without misleading?
+
+STEP 4 — SOURCE SELECTION (STRICT)
+Choose ONE source per shot:
+
+- web:
+  Use ONLY if the idea refers to a real-world event, protest, conflict, document, or incident.
+- wikimedia:
+  Use ONLY for recognizable people, institutions, or landmarks.
+- pexels:
+  Use ONLY for non-specific emotion, environment, or pacing shots.
+- flux:
+  Use ONLY for abstract concepts, data metaphors, or future scenarios.
+
+NEVER:
+- Use stock footage for named events.
+- Use AI for real people or historical moments.
+- Use literal imagery for abstract systems.
+
+STEP 5 — QUERY DESIGN
+- Queries must be concise, descriptive, and unambiguous.
+- Include location only if contextually required.
+- Prefer neutral, journalistic phrasing.
+
+OUTPUT FORMAT (JSON ONLY — one entry per input segment):
+[
+  {
+    "segment_order": 1,
+    "shots": [
+      {
+        "visual_query": "...",
+        "visual_type": "archive | emotional | scenic | data",
+        "visual_source": "web | wikimedia | pexels | flux"
+      }
+    ]
+  }
+]
+
+QUALITY RULES:
+- Every shot must be defensible in an editorial review.
+- If unsure, choose abstraction over misinformation.
+
+""")
+
+class VisualDirector:
+    # Concurrent LLM requests; the client's shared token bucket keeps the
+    # aggregate rate inside the provider's RPM budget.
+    MAX_WORKERS = 4
+
+    # Segments per LLM call: the ~600-token preamble is identical for every
+    # segment, so batching amortizes it (and the round trip) across B inputs
+    BATCH_SIZE = 4
+
+    def __init__(self, cache_dir="output/visual_plan_cache"):
+        self.llm = LLM_Client()
+        # Content-addressed cache of raw shot lists: identical narration (and
+        # context) replays from disk instead of making a paid LLM call again
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._mem_cache = {}
+        self._mem_cache_lock = Lock()
+
+    @staticmethod
+    def _cache_key(last_visual: str, narration: str) -> str:
+        raw = f"{_PROMPT_VERSION}|{last_visual}|{narration}".encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def _cache_get(self, key: str):
+        with self._mem_cache_lock:
+            if key in self._mem_cache:
+                return self._mem_cache[key]
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        try:
+            with open(path, "rb") as f:
+                shot_data = orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return None
+        with self._mem_cache_lock:
+            self._mem_cache[key] = shot_data
+        return shot_data
+
+    def _cache_put(self, key: str, shot_data):
+        with self._mem_cache_lock:
+            self._mem_cache[key] = shot_data
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        # Write-to-temp + rename: a crash mid-write leaves either the old
+        # entry or none, never a torn file the next run would choke on
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(shot_data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def plan_visuals(self, script: FullScript, output_path: str) -> list[VisualPlan]:
+        print(f"🎬  Directing Visuals for: {script.title}...")
+
+        # 1. LOAD PARTIAL PROGRESS (Smart Resume)
+        final_plans = []
+        if os.path.exists(output_path):
+            try:
+                data = read_plan(output_path)
+                final_plans = [VisualPlan(**item) for item in data]
+                # Migrate legacy array-form files to JSONL so the per-segment
+                # checkpoints below can append. Files already in JSONL skip
+                # this entirely — re-dumping N plans per resume is the O(N^2)
+                # serialization the append-only format exists to avoid.
+                with open(output_path, "rb") as f:
+                    legacy = f.read(64).lstrip().startswith(b"[")
+                    size = f.seek(0, os.SEEK_END)
+                    torn_tail = False
+                    if size:
+                        f.seek(size - 1)
+                        torn_tail = f.read(1) != b"\n"
+                if legacy or torn_tail:
+                    rewrite_plan(output_path, [p.model_dump() for p in final_plans])
+                print(f"    👉 Found {len(final_plans)} segments already planned. Resuming...")
+            except Exception as e:
+                print(f"    ⚠️ Could not load existing plan: {e}. Starting fresh.")
+                final_plans = []
+                # Clear the unreadable file before the append phase below:
+                # appending JSONL after corrupt content would fail the next
+                # load too, re-planning everything and growing the file on
+                # every run instead of healing it
+                rewrite_plan(output_path, [])
+
+        completed = {p.segment_order: p for p in final_plans}
+
+        # Context Memory: snapshot the last planned visual once before fan-out
+        # so segment jobs stay independent of each other
+        last_visual = "None"
+        if final_plans and final_plans[-1].shots:
+            last_visual = final_plans[-1].shots[-1].visual_query
+
+        pending = [s for s in script.segments if s.segment_order not in completed]
+
+        checkpoint_lock = Lock()
+
+        # 2. PLAN ALL PENDING SEGMENTS CONCURRENTLY, IN BATCHES
+        # Batches are independent, so the wall time is dominated by the
+        # slowest round of LLM round-trips instead of their sum; within a
+        # batch the shared prompt preamble is paid once for B segments. Each
+        # finished segment is checkpointed with a single O(1) JSONL append
+        # rather than a rewrite of the whole plan.
+        batches = [pending[i:i + self.BATCH_SIZE]
+                   for i in range(0, len(pending), self.BATCH_SIZE)]
+
+        first_error = None
+        with open(output_path, "ab") as checkpoint_file, \
+             ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            futures = {
+                pool.submit(self._plan_batch, batch, last_visual): batch
+                for batch in batches
+            }
+            for fut in as_completed(futures):
+                batch = futures[fut]
+                try:
+                    plans = fut.result()
+                except Exception as e:
+                    orders = [s.segment_order for s in batch]
+                    print(f"    ❌ Error directing segments {orders}: {e}")
+                    if first_error is None:
+                        first_error = e
+                    continue
+
+                with checkpoint_lock:
+                    for plan in plans:
+                        completed[plan.segment_order] = plan
+                        append_plan(checkpoint_file, plan.model_dump())
+
+        if first_error is not None:
+            print("    ⚠️ Saving progress. Run pipeline again to resume.")
+            raise first_error
+
+        return [completed[k] for k in sorted(completed)]
+
+    def _plan_batch(self, segments, last_visual: str) -> list[VisualPlan]:
+        orders = [s.segment_order for s in segments]
+        print(f"    👉 Planning Segments {orders}...")
+
+        # Per-segment cache probe first: a batch of all-hits never touches
+        # the network, and partial hits shrink the LLM call
+        plans = {}
+        misses = []
+        for seg in segments:
+            shot_data = self._cache_get(self._cache_key(last_visual, seg.narration_text))
+            if shot_data is not None:
+                print(f"    💾 Segment {seg.segment_order}: cached plan hit.")
+                plans[seg.segment_order] = self._build_plan(seg, shot_data)
+            else:
+                misses.append(seg)
+
+        if misses:
+            by_order = self._direct_segments(misses, last_visual)
+            for seg in misses:
+                shot_data = by_order.get(seg.segment_order)
+                if shot_data is None:
+                    raise ValueError(f"LLM batch response missing segment {seg.segment_order}")
+                self._cache_put(self._cache_key(last_visual, seg.narration_text), shot_data)
+                plans[seg.segment_order] = self._build_plan(seg, shot_data)
+
+        return [plans[k] for k in sorted(plans)]
+
+    def _direct_segments(self, segments, last_visual: str) -> dict:
+        """One LLM call covering up to BATCH_SIZE segments; returns a dict of
+        segment_order -> raw shot list."""
+        segment_block = "\n".join(
+            f'- segment_order: {s.segment_order}\n  narration: "{s.narration_text}"'
+            for s in segments
+        )
+
+        # No fixed sleep here: the GeminiClient token bucket already governs
+        # aggregate RPM across workers and only waits when tokens run out
+        prompt = _PROMPT_TMPL.substitute(
+            last_visual=last_visual, segment_block=segment_block
+        )
+
+        response_text = self.llm.generate_json(prompt)
+        clean_json = _FENCE_RE.sub("", response_text)
+        entries = orjson.loads(clean_json)
+
+        return {e.get("segment_order"): e.get("shots", []) for e in entries}
+
+    @staticmethod
+    def _build_plan(segment, shot_data) -> VisualPlan:
+        valid_shots = []
+        for s in shot_data:
+            valid_shots.append(VisualShot(
+                visual_query=s.get("visual_query", "abstract background"),
+                visual_type=s.get("visual_type", "scenic"),
+                visual_source=s.get("visual_source", "pexels")
+            ))
+
+        return VisualPlan(segment_order=segment.segment_order, shots=valid_shots)
@@ -1,44 +1,74 @@
-import os
-import asyncio
-import edge_tts
-from core.schemas import FullScript
-
-# FIX: Added 'async' keyword here so it can be awaited in run_pipeline.py
-async def run_tts(script: FullScript, output_dir="output/audio", max_retries: int = 3):
-    print(f"🎙️  Generating Neural Voiceover (EdgeTTS)...")
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # VOICE SELECTION:
-    # "en-US-ChristopherNeural" -> Deep, Documentary
-    voice = "en-US-ChristopherNeural"
-
-    for seg in script.segments:
-        filename = f"segment_{seg.segment_order:02d}.mp3"
-        filepath = os.path.join(output_dir, filename)
-        
-        # Smart Resume
-        if os.path.exists(filepath):
-            continue
-
-        print(f"   🗣️  Speaking Segment {seg.segment_order}...")
-        
-        # Retry loop with exponential backoff
-        for attempt in range(1, max_retries + 1):
-            try:
-                # FIX: Using the Python library directly prevents quote/character errors
-                communicate = edge_tts.Communicate(seg.narration_text, voice)
-                await communicate.save(filepath)
-                break  # Success: exit retry loop
-                
-            except Exception as e:
-                if attempt == max_retries:
-                    # Final attempt failed
-                    print(f"      ❌ Error generating audio for segment {seg.segment_order} (attempt {attempt}/{max_retries}): {e}")
-                    raise
-                else:
-                    # Retry with exponential backoff
-                    wait_time = 2 ** (attempt - 1)  # 1s, 2s, 4s
-                    print(f"      ⚠️ Attempt {attempt}/{max_retries} failed. Retrying in {wait_time}s...")
-                    await asyncio.sleep(wait_time)
-
-    print(f"   ✅ Audio generation complete.")
\ No newline at end of file
+import os
+import asyncio
+import aiofiles
+import edge_tts
+from core.schemas import FullScript
+
+def _size_or_zero(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+# FIX: Added 'async' keyword here so it can be awaited in run_pipeline.py
+async def run_tts(script: FullScript, output_dir="output/audio", max_retries: int = 3):
+    print(f"🎙️  Generating Neural Voiceover (EdgeTTS)...")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # VOICE SELECTION:
+    # "en-US-ChristopherNeural" -> Deep, Documentary
+    voice = "en-US-ChristopherNeural"
+
+    # Bounded fan-out: segments are independent, so overlapping the network
+    # round trips to the TTS service turns 40x single-segment latency into
+    # roughly the slowest batch. The semaphore keeps us polite.
+    sem = asyncio.Semaphore(6)
+
+    async def _speak_one(seg, filepath):
+        async with sem:
+            print(f"   🗣️  Speaking Segment {seg.segment_order}...")
+
+            # Retry loop with exponential backoff
+            for attempt in range(1, max_retries + 1):
+                try:
+                    # FIX: Using the Python library directly prevents quote/character errors
+                    communicate = edge_tts.Communicate(seg.narration_text, voice)
+                    # Stream chunks through aiofiles instead of .save():
+                    # disk writes happen off the event loop, so other
+                    # segments keep pulling TTS bytes while this one flushes
+                    async with aiofiles.open(filepath, "wb") as f:
+                        async for chunk in communicate.stream():
+                            if chunk["type"] == "audio":
+                                await f.write(chunk["data"])
+                    return  # Success: exit retry loop
+
+                except Exception as e:
+                    if attempt == max_retries:
+                        # Final attempt failed
+                        print(f"      ❌ Error generating audio for segment {seg.segment_order} (attempt {attempt}/{max_retries}): {e}")
+                        raise
+                    else:
+                        # Retry with exponential backoff
+                        wait_time = 2 ** (attempt - 1)  # 1s, 2s, 4s
+                        print(f"      ⚠️ Attempt {attempt}/{max_retries} failed. Retrying in {wait_time}s...")
+                        await asyncio.sleep(wait_time)
+
+    tasks = []
+    for seg in script.segments:
+        filename = f"segment_{seg.segment_order:02d}.mp3"
+        filepath = os.path.join(output_dir, filename)
+
+        # Smart Resume (one stat; a zero-byte leftover gets regenerated)
+        if _size_or_zero(filepath) > 0:
+            continue
+
+        tasks.append(_speak_one(seg, filepath))
+
+    # Let every in-flight segment settle before surfacing a failure, so a
+    # re-run resumes from whatever did complete
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for res in results:
+        if isinstance(res, Exception):
+            raise res
+
+    print(f"   ✅ Audio generation complete.")
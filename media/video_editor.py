@@ -1,13 +1,16 @@
 import os
 import re
+import subprocess
 import numpy as np
 import cv2
 from PIL import Image
 import atexit
+from concurrent.futures import ProcessPoolExecutor
+from imageio_ffmpeg import get_ffmpeg_exe
 
 # --- MOVIEPY v2.2.1 IMPORTS ---
 from moviepy.audio.io.AudioFileClip import AudioFileClip
-from moviepy.audio.AudioClip import CompositeAudioClip, AudioClip
+from moviepy.audio.AudioClip import CompositeAudioClip, AudioClip, concatenate_audioclips
 from moviepy.audio.fx.MultiplyVolume import MultiplyVolume
 from moviepy.audio.fx.AudioLoop import AudioLoop
 from moviepy.video.VideoClip import VideoClip, ImageClip
@@ -15,11 +18,64 @@ from moviepy.video.compositing.CompositeVideoClip import concatenate_videoclips
 from moviepy.video.io.VideoFileClip import VideoFileClip
 from moviepy.video.fx.Loop import Loop
 from media.music_provider import MusicProvider
-from PIL import Image, ImageFilter, ImageEnhance
 # ------------------------------
 
 from core.schemas import FullScript
 
+# CUDA-built OpenCV keeps the zoom warp on the GPU; stock pip wheels ship
+# without the cuda module, so probe once and fall back to the CPU kernels
+try:
+    _CUDA_OK = cv2.cuda.getCudaEnabledDeviceCount() > 0
+except (AttributeError, cv2.error):
+    _CUDA_OK = False
+
+class FFmpegWriter:
+    """Streams raw RGB frames into a single ffmpeg NVENC encode process.
+
+    One encoder, one pipe: frames go straight from OpenCV buffers into
+    NVENC without MoviePy's per-frame Python callback pipeline in between.
+    """
+
+    def __init__(self, path: str, w: int, h: int, fps: int):
+        cmd = [
+            get_ffmpeg_exe(), "-y",
+            "-f", "rawvideo", "-vcodec", "rawvideo",
+            "-pix_fmt", "rgb24", "-s", f"{w}x{h}", "-r", str(fps),
+            "-i", "-",
+            "-an",
+            "-c:v", "h264_nvenc",
+            "-preset", "p1",
+            "-rc", "vbr",
+            "-cq", "23",
+            "-b:v", "0",
+            "-pix_fmt", "yuv420p",
+            path,
+        ]
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def write(self, frame: np.ndarray):
+        self.proc.stdin.write(frame.tobytes())
+
+    def close(self):
+        if self.proc.stdin:
+            self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError("ffmpeg visual-track encode failed")
+
+    def abort(self):
+        try:
+            if self.proc.stdin:
+                self.proc.stdin.close()
+            self.proc.kill()
+            self.proc.wait()
+        except Exception:
+            pass
+
 class VideoEditor:
     def __init__(self, output_dir="output/video"):
         self.output_dir = output_dir
@@ -30,115 +86,154 @@ class VideoEditor:
         self.w = 1920
         self.h = 1080
         self.fps = 24
+        self.target_ratio = self.w / self.h  # 1.77
+
+        # Filled once per assembly by _scan_asset_listings; None means fall
+        # back to a per-segment listdir (e.g. editor used standalone)
+        self._seg_listings = None
 
     def _sanitize_filename(self, text: str) -> str:
         clean = re.sub(r'[<>:"/\\|?*]', '', text)
         return clean.replace(' ', '_')
 
+    @staticmethod
+    def _resize(arr, new_w, new_h):
+        # INTER_AREA antialiases on downscale; LANCZOS4 keeps upscales sharp.
+        # Either way this runs OpenCV's SIMD kernels, not Pillow's scalar loop.
+        src_h, src_w = arr.shape[:2]
+        interp = cv2.INTER_AREA if new_w * new_h < src_w * src_h else cv2.INTER_LANCZOS4
+        return cv2.resize(arr, (new_w, new_h), interpolation=interp)
+
     def _preprocess_image(self, image_path):
-        cache_path = image_path + ".cache.npy"
-        
+        # Raw memmap cache: frames come back as a page-faulted view instead
+        # of an upfront 6 MB read+allocate per image, and the page cache is
+        # shared across runs. Output geometry is fixed, so no header needed.
+        cache_path = image_path + ".cache.raw"
+        shape = (self.h, self.w, 3)
+
         # 1. HIT CACHE
-        if os.path.exists(cache_path):
-            try:
-                return np.load(cache_path)
-            except Exception: pass
+        try:
+            if os.path.getsize(cache_path) == self.h * self.w * 3:
+                return np.memmap(cache_path, dtype=np.uint8, mode="r", shape=shape)
+        except OSError:
+            pass
 
         # 2. MISS CACHE - PROCESS
-        with Image.open(image_path) as img:
-            img = img.convert("RGB")
-            img_w, img_h = img.size
-            img_ratio = img_w / img_h
-            target_ratio = self.w / self.h # 1.77
-            
-            # --- DECISION LOGIC ---
-            # If image is Portrait (Vertical) or Square-ish (< 1.4 ratio), use Blurred Pillars
-            if img_ratio < 1.4:
-                # A. CREATE BACKGROUND (Blurred & Darkened)
-                # Resize to fill width, then crop height
-                bg_scale = self.w / img_w
-                bg_w = self.w
-                bg_h = int(img_h * bg_scale)
-                bg = img.resize((bg_w, bg_h), Image.Resampling.LANCZOS)
-                
-                # Center Crop Vertical
-                top = (bg_h - self.h) // 2
-                if top < 0: top = 0
-                bg = bg.crop((0, top, self.w, top + self.h))
-                
-                # Blur & Darken
-                bg = bg.filter(ImageFilter.GaussianBlur(radius=30))
-                bg = ImageEnhance.Brightness(bg).enhance(0.6)
-                
-                # B. CREATE FOREGROUND (Fit Height)
-                # Resize to fit height (1080), maintain ratio
-                fg_scale = self.h / img_h
-                fg_h = self.h
-                fg_w = int(img_w * fg_scale)
-                fg = img.resize((fg_w, fg_h), Image.Resampling.LANCZOS)
-                
-                # C. COMPOSITE
-                # Paste FG onto BG center
-                final_img = bg.copy()
-                x_pos = (self.w - fg_w) // 2
-                final_img.paste(fg, (x_pos, 0))
-                
-                img_array = np.array(final_img)
+        # Decode once via OpenCV; convert to RGB so downstream MoviePy frames
+        # keep their meaning. PIL stays as fallback for formats cv2 won't read.
+        img = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        if img is None:
+            with Image.open(image_path) as pil_img:
+                img = np.array(pil_img.convert("RGB"))
+        else:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+        img_h, img_w = img.shape[:2]
+        img_ratio = img_w / img_h
 
-            # --- LANDSCAPE LOGIC (Existing Crop) ---
+        # --- DECISION LOGIC ---
+        # Both branches below crop in SOURCE coordinates first, then resize
+        # straight to the 1920x1080 target. Fusing the two steps this way
+        # skips the full-size intermediate buffer the old resize-then-crop
+        # order allocated, resizes only pixels that survive the crop, and
+        # yields a contiguous output with no trailing copy.
+
+        # If image is Portrait (Vertical) or Square-ish (< 1.4 ratio), use Blurred Pillars
+        if img_ratio < 1.4:
+            # A. CREATE BACKGROUND (Blurred & Darkened)
+            # Center-crop the source to 16:9, then one resize to full frame.
+            # Plain bilinear here: the sigma-30 blur below wipes out any
+            # high-frequency detail a Lanczos/area kernel would preserve, so
+            # the extra convolution taps would be pure waste
+            src_h = min(int(img_w / self.target_ratio), img_h)
+            top = (img_h - src_h) // 2
+            bg = cv2.resize(
+                img[top:top + src_h], (self.w, self.h),
+                interpolation=cv2.INTER_LINEAR,
+            )
+
+            # Blur & Darken. stackBlur (OpenCV 4.7+) is O(1) per pixel via
+            # running sums — a sigma-30 Gaussian is ~120 taps/pixel and the
+            # difference is invisible once darkened to 60%. Older builds get
+            # the same shape from three cascaded box filters (central limit).
+            if hasattr(cv2, "stackBlur"):
+                bg = cv2.stackBlur(bg, (61, 61))
             else:
-                if img_ratio > target_ratio:
-                    # Too Wide -> Fit Height, Crop Width
-                    new_h = self.h
-                    new_w = int(img_w * (self.h / img_h))
-                    img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-                    left = (new_w - self.w) // 2
-                    img = img.crop((left, 0, left + self.w, self.h))
-                else:
-                    # Too Tall (but still landscape) -> Fit Width, Crop Height
-                    new_w = self.w
-                    new_h = int(img_h * (self.w / img_w))
-                    img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-                    top = (new_h - self.h) // 2
-                    img = img.crop((0, top, self.w, top + self.h))
-                
-                img_array = np.array(img)
+                for _ in range(3):
+                    bg = cv2.boxFilter(bg, -1, (21, 21), borderType=cv2.BORDER_REPLICATE)
+            bg = cv2.convertScaleAbs(bg, alpha=0.6)
+
+            # B. CREATE FOREGROUND (Fit Height)
+            # Resize to fit height (1080), maintain ratio
+            fg_h = self.h
+            fg_w = int(img_w * (self.h / img_h))
+            fg = self._resize(img, fg_w, fg_h)
+
+            # C. COMPOSITE (slice assignment == paste center)
+            x_pos = (self.w - fg_w) // 2
+            bg[:, x_pos:x_pos + fg_w] = fg
+            img_array = bg
+
+        # --- LANDSCAPE LOGIC (Cover Crop) ---
+        else:
+            if img_ratio > self.target_ratio:
+                # Too Wide -> crop width down to 16:9
+                src_w = int(img_h * self.target_ratio)
+                left = (img_w - src_w) // 2
+                src = img[:, left:left + src_w]
+            else:
+                # Too Tall (but still landscape) -> crop height down to 16:9
+                src_h = int(img_w / self.target_ratio)
+                top = (img_h - src_h) // 2
+                src = img[top:top + src_h, :]
+
+            img_array = self._resize(src, self.w, self.h)
 
         # 3. SAVE CACHE
-        np.save(cache_path, img_array)
-        return img_array
+        try:
+            mm = np.memmap(cache_path, dtype=np.uint8, mode="w+", shape=shape)
+            mm[:] = img_array
+            mm.flush()
+        except (OSError, ValueError):
+            # Unexpected geometry or full disk: serve the in-memory array
+            return img_array
+        return np.memmap(cache_path, dtype=np.uint8, mode="r", shape=shape)
 
     def _create_zooming_clip(self, image_path, duration):
         # Load Base Image (Cached)
         base_img = self._preprocess_image(image_path)
         h, w = base_img.shape[:2]
+        center = (w / 2, h / 2)
+        out_size = (self.w, self.h)
 
-        def make_frame(t):
-            # 1. Calculate Scale (Linear interpolation)
-            # t goes from 0 to duration
-            scale = 1.0 + 0.04 * (t / duration)
-            
-            # 2. OpenCV Resize (C++ Speed)
-            # Only resize to the new needed dimension
-            new_w = int(w * scale)
-            new_h = int(h * scale)
-            
-            # cv2.INTER_LINEAR is roughly equivalent to PIL BILINEAR but faster
-            resized = cv2.resize(base_img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
-            
-            # 3. Center Crop (NumPy Slicing is instant)
-            center_x = new_w // 2
-            center_y = new_h // 2
-            
-            x1 = center_x - (self.w // 2)
-            y1 = center_y - (self.h // 2)
-            
-            # Safety checks for rounding errors
-            if x1 < 0: x1 = 0
-            if y1 < 0: y1 = 0
-            
-            # Return the cropped 1920x1080 frame
-            return resized[y1:y1+self.h, x1:x1+self.w]
+        # Everything invariant is bound once here: make_frame runs 24x per
+        # second of footage, so per-call attribute lookups and re-derived
+        # constants add up across a full video
+        zoom_rate = 0.04 / duration
+        get_matrix = cv2.getRotationMatrix2D
+        interp = cv2.INTER_LINEAR
+        border = cv2.BORDER_REPLICATE
+
+        if _CUDA_OK:
+            # Upload the base frame once; only the 2x3 matrix changes per
+            # frame, so the warp runs entirely in VRAM and just the finished
+            # 1080p frame comes back over PCIe
+            gpu_base = cv2.cuda_GpuMat()
+            gpu_base.upload(np.asarray(base_img))
+            gpu_warp = cv2.cuda.warpAffine
+
+            def make_frame(t):
+                M = get_matrix(center, 0, 1.0 + zoom_rate * t)
+                return gpu_warp(gpu_base, M, out_size, flags=interp, borderMode=border).download()
+        else:
+            warp = cv2.warpAffine
+
+            def make_frame(t):
+                # Zoom about the center with a single affine warp: writes only
+                # the 1920x1080 output instead of allocating the oversized
+                # resized intermediate and slicing it down per frame
+                M = get_matrix(center, 0, 1.0 + zoom_rate * t)
+                return warp(base_img, M, out_size, flags=interp, borderMode=border)
 
         # Returns a clip that generates its own frames when asked
         clip = VideoClip(make_frame, duration=duration)
@@ -146,49 +241,304 @@ class VideoEditor:
         return clip
 
 
+    def _warm_image_caches(self, script: FullScript):
+        """Preprocess every segment image in parallel before assembly.
+
+        Each decode+resize+blur is pure CPU work with no shared state, so a
+        process pool fills the .cache.raw files across all cores; the serial
+        MoviePy loop below then gets cache hits only. Videos stay out of the
+        pool (ffmpeg handles those)."""
+        image_paths = []
+        for segment in script.segments:
+            seg_dir, asset_files = self._list_assets(segment.segment_order)
+            for name in asset_files:
+                if name.endswith(('.jpg', '.png', '.jpeg')):
+                    image_paths.append(os.path.join(seg_dir, name))
+
+        if not image_paths:
+            return
+        print(f"   🔥 Warming {len(image_paths)} image caches on {os.cpu_count()} cores...")
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            # _warm_one returns None so 6 MB frames aren't pickled back
+            list(pool.map(_warm_one, image_paths))
+
+    def _segment_audio(self, segment):
+        """Returns (audio_clip, duration) for a segment, with the silent
+        fallback when narration audio is missing or corrupt."""
+        audio_path = os.path.join(self.audio_dir, f"segment_{segment.segment_order:02d}.mp3")
+
+        if os.path.exists(audio_path) and os.path.getsize(audio_path) >= 1024:
+            try:
+                audio_clip = AudioFileClip(audio_path)
+                return audio_clip, audio_clip.duration
+            except Exception as e:
+                print(f"      ⚠️ Failed to load audio '{audio_path}': {e}. Using silent fallback.")
+        else:
+            print(f"      ⚠️ Audio missing or too small ({audio_path}). Using silent fallback.")
+
+        # Estimate duration from narration length (approx 15 chars/sec)
+        duration = max(len(segment.narration_text) / 15.0, 1.0)
+        return AudioClip(lambda t: 0.0, duration=duration, fps=44100), duration
+
+    def _scan_asset_listings(self):
+        """One scandir pass over output/assets: {seg_idx: sorted shot names}.
+
+        DirEntry carries the stat info from the directory read itself, so
+        this replaces the exists+listdir pair every segment would otherwise
+        issue."""
+        listings = {}
+        try:
+            for entry in os.scandir(self.assets_dir):
+                if not (entry.is_dir() and entry.name.startswith("segment_")):
+                    continue
+                try:
+                    seg_idx = int(entry.name.split("_")[1])
+                except (IndexError, ValueError):
+                    continue
+                listings[seg_idx] = sorted(
+                    e.name for e in os.scandir(entry.path)
+                    if e.is_file()
+                    and e.name.endswith(('.jpg', '.png', '.jpeg', '.mp4'))
+                    and not e.name.endswith('.norm.mp4')  # derived copies, not shots
+                )
+        except FileNotFoundError:
+            pass
+        return listings
+
+    def _list_assets(self, seg_idx: int):
+        """Sorted playable assets for a segment (shot_00, shot_01, ...)."""
+        seg_assets_dir = os.path.join(self.assets_dir, f"segment_{seg_idx:02d}")
+        if self._seg_listings is not None:
+            return seg_assets_dir, self._seg_listings.get(seg_idx, [])
+        if os.path.exists(seg_assets_dir):
+            asset_files = sorted([
+                f for f in os.listdir(seg_assets_dir)
+                if f.endswith(('.jpg', '.png', '.jpeg', '.mp4'))
+                and not f.endswith('.norm.mp4')  # derived copies, not shots
+            ])
+        else:
+            asset_files = []
+        return seg_assets_dir, asset_files
+
+    def _stream_image_zoom(self, writer: FFmpegWriter, image_path: str, n_frames: int):
+        """Writes the Ken Burns zoom for one image straight into the encoder."""
+        base_img = self._preprocess_image(image_path)
+        h, w = base_img.shape[:2]
+        center = (w / 2, h / 2)
+        out_size = (self.w, self.h)
+        zoom_rate = 0.04 / max(n_frames - 1, 1)
+        if _CUDA_OK:
+            gpu_base = cv2.cuda_GpuMat()
+            gpu_base.upload(np.asarray(base_img))
+            for k in range(n_frames):
+                M = cv2.getRotationMatrix2D(center, 0, 1.0 + zoom_rate * k)
+                writer.write(cv2.cuda.warpAffine(
+                    gpu_base, M, out_size,
+                    flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE,
+                ).download())
+            return
+        for k in range(n_frames):
+            M = cv2.getRotationMatrix2D(center, 0, 1.0 + zoom_rate * k)
+            writer.write(cv2.warpAffine(
+                base_img, M, out_size,
+                flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE,
+            ))
+
+    def _normalize_asset(self, asset_path: str) -> str:
+        """Pre-scales stock footage to 1920x1080@24 exactly once per asset.
+
+        The .norm.mp4 sits next to the original, so every later run (retry,
+        music swap, re-render) decodes at target geometry and skips the
+        per-frame resize+crop entirely. Still images get the same treatment
+        from _preprocess_image's .cache.raw memmap."""
+        if not asset_path.endswith(".mp4"):
+            return asset_path
+
+        norm_path = asset_path + ".norm.mp4"
+        if os.path.exists(norm_path) and os.path.getsize(norm_path) > 0:
+            return norm_path
+
+        vf = (f"scale={self.w}:{self.h}:force_original_aspect_ratio=increase,"
+              f"crop={self.w}:{self.h},fps={self.fps}")
+        try:
+            subprocess.run(
+                [get_ffmpeg_exe(), "-y", "-i", asset_path,
+                 "-vf", vf, "-c:v", "h264_nvenc", "-preset", "p1", "-an",
+                 norm_path],
+                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+        except Exception:
+            # No NVENC or a bad source file: render from the original
+            try:
+                os.remove(norm_path)
+            except OSError:
+                pass
+            return asset_path
+        return norm_path
+
+    def _stream_video_asset(self, writer: FFmpegWriter, asset_path: str, n_frames: int):
+        """Decodes stock footage with VideoCapture and writes cover-cropped
+        1920x1080 frames into the encoder, looping short clips and padding
+        with black if the file dies early. One decode, one SIMD resize, one
+        pipe write per frame — no clip-graph in between."""
+        cap = cv2.VideoCapture(self._normalize_asset(asset_path))
+        src_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.w
+        src_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.h
+
+        # Cover logic: scale so both dimensions fill, then center crop
+        scale = max(self.w / src_w, self.h / src_h)
+        new_w, new_h = int(round(src_w * scale)), int(round(src_h * scale))
+        x1 = max((new_w - self.w) // 2, 0)
+        y1 = max((new_h - self.h) // 2, 0)
+
+        written = 0
+        just_rewound = False
+        while written < n_frames:
+            ok, frame = cap.read()
+            if not ok:
+                if just_rewound:
+                    break  # file yields nothing even from the start
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # loop short clips
+                just_rewound = True
+                continue
+            just_rewound = False
+
+            # Normalized assets arrive at exactly 1920x1080; only transform
+            # when the source geometry differs
+            if (new_w, new_h) != (src_w, src_h):
+                frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+            if new_w != self.w or new_h != self.h:
+                frame = frame[y1:y1 + self.h, x1:x1 + self.w]
+            # BGR -> RGB also makes the cropped view contiguous for the pipe
+            writer.write(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            written += 1
+        cap.release()
+
+        if written < n_frames:
+            black = np.zeros((self.h, self.w, 3), dtype=np.uint8)
+            for _ in range(n_frames - written):
+                writer.write(black)
+
+    def _assemble_fast(self, script: FullScript, bg_music_path: str, output_path: str):
+        """Direct-to-NVENC render: stream frames into one ffmpeg process,
+        then mux the audio track on without re-encoding video.
+
+        MoviePy's clip tree dispatches a Python callback per frame, which
+        caps throughput well below what NVENC can ingest; this path keeps
+        the per-frame work to one warpAffine and one pipe write.
+        """
+        # Plan all segments up front so failures surface before the encoder
+        # starts
+        plan = []
+        audio_clips = []
+        for segment in script.segments:
+            audio_clip, duration = self._segment_audio(segment)
+            seg_dir, asset_files = self._list_assets(segment.segment_order)
+            audio_clips.append(audio_clip)
+            plan.append((segment.segment_order, duration, seg_dir, asset_files))
+
+        video_only = output_path + ".visual.mp4"
+        audio_tmp = output_path + ".audio.m4a"
+        music_clip = None
+        # One finally owns ALL cleanup from here: an encode failure is the
+        # designed trigger for the MoviePy fallback (every machine without
+        # NVENC takes it), and the fallback must not inherit N open segment
+        # audio readers (an ffmpeg subprocess each) or a partial .visual.mp4
+        try:
+            writer = FFmpegWriter(video_only, self.w, self.h, self.fps)
+            try:
+                black = None
+                for seg_idx, duration, seg_dir, asset_files in plan:
+                    print(f"   Encoding Segment {seg_idx}...")
+                    n_total = max(int(round(duration * self.fps)), 1)
+
+                    if not asset_files:
+                        if black is None:
+                            black = np.zeros((self.h, self.w, 3), dtype=np.uint8)
+                        for _ in range(n_total):
+                            writer.write(black)
+                        continue
+
+                    # Distribute the segment's frames across its shots
+                    per, extra = divmod(n_total, len(asset_files))
+                    for i, asset_file in enumerate(asset_files):
+                        n_frames = per + (1 if i < extra else 0)
+                        if not n_frames:
+                            continue
+                        asset_path = os.path.join(seg_dir, asset_file)
+                        if asset_file.endswith(".mp4"):
+                            self._stream_video_asset(writer, asset_path, n_frames)
+                        else:
+                            self._stream_image_zoom(writer, asset_path, n_frames)
+                writer.close()
+            except Exception:
+                writer.abort()
+                raise
+
+            # --- AUDIO: narration chain + music bed, muxed without video re-encode ---
+            final_audio = concatenate_audioclips(audio_clips)
+            if bg_music_path and os.path.exists(bg_music_path):
+                print(f"   🎵 Adding Background Music...")
+                music_clip = AudioFileClip(bg_music_path)
+                if music_clip.duration < final_audio.duration:
+                    music_clip = music_clip.with_effects([AudioLoop(duration=final_audio.duration)])
+                else:
+                    music_clip = music_clip.subclipped(0, final_audio.duration)
+                music_clip = music_clip.with_effects([MultiplyVolume(0.07)])
+                final_audio = CompositeAudioClip([final_audio, music_clip])
+
+            final_audio.write_audiofile(audio_tmp, fps=44100, codec="aac", logger=None)
+            subprocess.run(
+                [get_ffmpeg_exe(), "-y",
+                 "-i", video_only, "-i", audio_tmp,
+                 "-map", "0:v:0", "-map", "1:a:0", "-c", "copy",
+                 output_path],
+                check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+        finally:
+            for clip in audio_clips:
+                if hasattr(clip, "close"):
+                    clip.close()
+            if music_clip is not None:
+                music_clip.close()
+            for tmp in (video_only, audio_tmp):
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
     def assemble_video(self, script: FullScript, bg_music_path: str = None):
         print(f"🎞️  Assembling video for: {script.title}")
-        
+
+        self._seg_listings = self._scan_asset_listings()
+        self._warm_image_caches(script)
+
+        safe_title = self._sanitize_filename(script.title)
+        output_path = os.path.join(self.output_dir, f"final_video_{safe_title}.mp4")
+
+        # Fast path first; anything it can't handle (no NVENC, pipe or mux
+        # failure) falls back to the MoviePy assembly below
+        try:
+            print("   🚀 Rendering via direct NVENC frame pipe...")
+            self._assemble_fast(script, bg_music_path, output_path)
+            print(f"\n✅ Video Render Complete: {output_path}")
+            return
+        except Exception as e:
+            print(f"   ⚠️ Fast path unavailable ({e}). Falling back to MoviePy.")
+
         final_clips = []
         
         # --- VISUAL ASSEMBLY ---
         for segment in script.segments:
             seg_idx = segment.segment_order
             print(f"   Processing Segment {seg_idx}...")
-            
-            # Audio
-            audio_path = os.path.join(self.audio_dir, f"segment_{seg_idx:02d}.mp3")
-            
-            # Validate audio file presence and size; use silent fallback for missing/corrupt files
-            use_silent = False
-            if not os.path.exists(audio_path) or os.path.getsize(audio_path) < 1024:
-                print(f"      ⚠️ Audio missing or too small ({audio_path}). Using silent fallback.")
-                use_silent = True
 
-            if not use_silent:
-                try:
-                    audio_clip = AudioFileClip(audio_path)
-                    duration = audio_clip.duration
-                except Exception as e:
-                    print(f"      ⚠️ Failed to load audio '{audio_path}': {e}. Using silent fallback.")
-                    use_silent = True
-
-            if use_silent:
-                # Estimate duration from narration length (approx 15 chars/sec)
-                duration = max(len(segment.narration_text) / 15.0, 1.0)
-                audio_clip = AudioClip(lambda t: 0.0, duration=duration, fps=44100)
-            
-            # Assets (Now scans for .mp4 AND images)
-            seg_assets_dir = os.path.join(self.assets_dir, f"segment_{seg_idx:02d}")
-            if os.path.exists(seg_assets_dir):
-                # Sort ensures shot_00, shot_01 play in order regardless of file type
-                asset_files = sorted([
-                    f for f in os.listdir(seg_assets_dir) 
-                    if f.endswith(('.jpg', '.png', '.jpeg', '.mp4'))
-                ])
-            else:
-                asset_files = []
-            
+            # Audio (with silent fallback for missing/corrupt files)
+            audio_clip, duration = self._segment_audio(segment)
+
+            # Assets (scans for .mp4 AND images; sorted so shots play in order)
+            seg_assets_dir, asset_files = self._list_assets(seg_idx)
+
             if not asset_files:
                 # Fallback Black Screen
                 black = np.zeros((self.h, self.w, 3), dtype=np.uint8)
@@ -258,9 +608,6 @@ class VideoEditor:
             final_video = final_video.with_audio(final_audio)
 
         # --- RENDERING (TURBO + LOW RAM) ---
-        safe_title = self._sanitize_filename(script.title)
-        output_path = os.path.join(self.output_dir, f"final_video_{safe_title}.mp4")
-        
         print("   🚀 Rendering with OpenCV Streaming + NVENC...")
         
         try:
@@ -299,6 +646,11 @@ class VideoEditor:
         
         print(f"\n✅ Video Render Complete: {output_path}")
 
+def _warm_one(image_path: str):
+    # Module-level so ProcessPoolExecutor can pickle it; the editor instance
+    # is rebuilt per call (cheap: it only sets paths and dimensions)
+    VideoEditor()._preprocess_image(image_path)
+
 def run_video_assembly(script: FullScript):
     editor = VideoEditor()
     music_provider = MusicProvider()
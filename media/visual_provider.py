@@ -3,7 +3,10 @@ import requests
 import random
 import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
@@ -11,6 +14,16 @@ class VisualProvider:
     def __init__(self):
         self.pexels_key = os.getenv("PEXELS_API_KEY")
         self.headers = {"Authorization": self.pexels_key}
+        # One keep-alive session: every lookup hits api.pexels.com, so only
+        # the first call pays the TCP+TLS handshake
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=2, backoff_factor=0.5),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
     def fetch_stock_asset(self, query: str, asset_type: str = "video") -> str | None:
         if not self.pexels_key:
@@ -24,39 +37,56 @@ class VisualProvider:
         ]
 
         base_url = "https://api.pexels.com/videos/search" if asset_type == "video" else "https://api.pexels.com/v1/search"
-        
-        for search_query in search_strategies:
-            time.sleep(0.5)
-            try:
-                params = {
-                    "query": search_query,
-                    "per_page": 10, 
-                    "orientation": "landscape",
-                    "size": "medium" 
-                }
-                
-                response = requests.get(base_url, headers=self.headers, params=params, timeout=10)
-                
-                if response.status_code == 429:
+
+        # Fire all strategies at once (the Pexels limit is per-minute, so 4
+        # parallel requests are safe), then pick winners in strategy order so
+        # the generic fallbacks ("abstract") never beat a real query hit.
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [
+                pool.submit(self._search_once, base_url, search_query, asset_type)
+                for search_query in search_strategies
+            ]
+            for future in futures:
+                result = future.result()
+                if result == "rate_limited":
                     print(f"      ⚠️ Pexels Rate Limit Hit! Cooling down for 60s...")
+                    for f in futures:
+                        f.cancel()
                     time.sleep(60)
                     return self.fetch_stock_asset(query, asset_type)
-                
-                data = response.json()
-                items = data.get("videos" if asset_type == "video" else "photos", [])
-                
-                if items:
-                    item = random.choice(items)
-                    if asset_type == "video":
-                        video_files = item.get("video_files", [])
-                        best_file = next((v for v in video_files if v["width"] == 1920), video_files[0] if video_files else None)
-                        if best_file:
-                            return best_file["link"]
-                    else:
-                        return item["src"]["large2x"]
-            except Exception as e:
-                print(f"      ⚠️ Pexels Error with '{search_query}': {e}")
-                continue
+                if result:
+                    return result
+        return None
+
+    def _search_once(self, base_url: str, search_query: str, asset_type: str) -> str | None:
+        """Runs a single Pexels search and extracts one asset URL from it."""
+        try:
+            params = {
+                "query": search_query,
+                "per_page": 10,
+                "orientation": "landscape",
+                "size": "medium"
+            }
+
+            response = self.session.get(base_url, headers=self.headers, params=params, timeout=10)
+
+            if response.status_code == 429:
+                return "rate_limited"
+
+            data = response.json()
+            items = data.get("videos" if asset_type == "video" else "photos", [])
+
+            if items:
+                item = random.choice(items)
+                if asset_type == "video":
+                    video_files = item.get("video_files", [])
+                    best_file = next((v for v in video_files if v["width"] == 1920), video_files[0] if video_files else None)
+                    if best_file:
+                        return best_file["link"]
+                else:
+                    return item["src"]["large2x"]
+        except Exception as e:
+            print(f"      ⚠️ Pexels Error with '{search_query}': {e}")
         return None
 
     def generate_ai_image(self, prompt: str) -> str:
@@ -1,6 +1,8 @@
 import requests
 import random
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 class WikimediaProvider:
     def __init__(self):
@@ -8,6 +10,16 @@ class WikimediaProvider:
         self.headers = {
             "User-Agent": "EvidencePipelineBot/1.0 (context_video_project)"
         }
+        # Keep-alive session: commons.wikimedia.org is hit once per editorial
+        # shot, and connection reuse drops the per-call handshake
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=2, backoff_factor=0.5),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def fetch_editorial_image(self, query: str) -> str | None:
         """
@@ -30,7 +42,7 @@ class WikimediaProvider:
         }
 
         try:
-            r = requests.get(self.api_url, params=params, headers=self.headers, timeout=10)
+            r = self.session.get(self.api_url, params=params, headers=self.headers, timeout=10)
             data = r.json()
             
             pages = data.get("query", {}).get("pages", {})
@@ -1,7 +1,10 @@
 import asyncio
-import json
 import hashlib
+import json
+import os
+import orjson
 from typing import List, Set
+from datasketch import MinHash, MinHashLSH
 from datetime import datetime
 from core.schemas import EvidenceBundle, EvidenceItem, SourceType
 from research.search_client import SearchClient
@@ -10,11 +13,18 @@ from intelligence.fact_extractor import FactExtractor
 from intelligence.llm_client import GeminiClient
 
 class DeepResearcher:
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         # Using Flash for planning/reasoning
         self.llm = GeminiClient(model_name="gemini-2.0-flash")
-        self.search_client = SearchClient()
+        self.search_client = SearchClient(use_cache=use_cache)
         self.extractor = FactExtractor()
+        # Bounds concurrent LLM extraction calls: ~15-20 at once just trades
+        # throughput for provider 429s and retry/backoff churn
+        self._extract_sem = asyncio.Semaphore(4)
+        # Plans are deterministic per topic for our purposes: cache them on
+        # disk so dev reruns and post-failure retries skip the 2-5s LLM call
+        self.plan_cache_dir = "output/.cache/plans"
+        os.makedirs(self.plan_cache_dir, exist_ok=True)
 
     def _generate_research_plan(self, topic: str) -> List[str]:
         """
@@ -34,6 +44,18 @@ class DeepResearcher:
         Return a JSON object with a key "queries" containing a list of strings.
         Example: {{ "queries": ["query 1", "query 2"] }}
         """
+        cache_path = os.path.join(
+            self.plan_cache_dir, hashlib.sha1(topic.encode("utf-8")).hexdigest() + ".json"
+        )
+        try:
+            with open(cache_path, "rb") as f:
+                queries = orjson.loads(f.read())
+            if queries:
+                print("   💾 Research plan served from cache.")
+                return queries
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            pass
+
         try:
             # Enforce JSON output via the client wrapper (if supported) or parsing
             response_json = self.llm.generate_json(prompt)
@@ -43,34 +65,32 @@ class DeepResearcher:
             # Guardrail: Ensure list format
             if not isinstance(queries, list) or not queries:
                 raise ValueError("LLM returned invalid query format")
-                
-            return queries[:5] # Limit to 5 max
+
+            queries = queries[:5] # Limit to 5 max
+            tmp = cache_path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(orjson.dumps(queries))
+            os.replace(tmp, cache_path)
+            return queries
             
         except Exception as e:
             print(f"⚠️ Plan generation failed: {e}. Falling back to default.")
             return [f"{topic} history", f"{topic} analysis", f"{topic} statistics"]
 
-    async def _process_url(self, url: str, source_type: SourceType) -> List[EvidenceItem]:
+    async def _extract_evidence(self, raw_text: str, url: str, source_type: SourceType) -> List[EvidenceItem]:
         """
-        Fetches and extracts facts from a single URL.
-        Runs in a thread to avoid blocking the async event loop.
+        Extracts facts from already-fetched page text.
+        FactExtractor uses LLM calls which are sync in your current client,
+        so the work runs in a thread, bounded by the extraction semaphore.
         """
         try:
-            # 1. Fetch Text (Blocking I/O wrapped in thread)
-            # We assume fetch_page_text handles its own requests.get timeout
-            raw_text = await asyncio.to_thread(self.search_client.fetch_page_text, url)
-            
-            if not raw_text or len(raw_text) < 200:
-                return []
-
-            # 2. Extract Facts (Blocking CPU/Network wrapped in thread)
-            # FactExtractor uses LLM calls which are sync in your current client
-            evidence = await asyncio.to_thread(
-                self.extractor.extract_from_text, 
-                raw_text, 
-                url, 
-                source_type
-            )
+            async with self._extract_sem:
+                evidence = await asyncio.to_thread(
+                    self.extractor.extract_from_text,
+                    raw_text,
+                    url,
+                    source_type
+                )
             return evidence
 
         except Exception as e:
@@ -87,21 +107,27 @@ class DeepResearcher:
         try:
             # 1. Search (Blocking I/O wrapped in thread)
             results = await asyncio.to_thread(self.search_client.search, query)
-            
-            # 2. Process Top 3 Results concurrently
-            tasks = []
+
+            # 2. Fetch Top 3 Results in one concurrent batch
+            targets = []
             for res in results[:3]:
                 url = res.get('href')
                 if not url: continue
-                
+
                 # Dynamic Source Typing
                 source_type = assess_source_credibility(url) or SourceType.OTHER_TRUSTED
-                
-                tasks.append(self._process_url(url, source_type))
-            
-            # Gather results for this query
+                targets.append((url, source_type))
+
+            texts = await self.search_client.fetch_many([url for url, _ in targets])
+
+            # 3. Extract facts from every page that returned real content
+            tasks = [
+                self._extract_evidence(raw_text, url, source_type)
+                for raw_text, (url, source_type) in zip(texts, targets)
+                if raw_text and len(raw_text) >= 200
+            ]
             results_lists = await asyncio.gather(*tasks)
-            
+
             # Flatten list of lists
             for res_list in results_lists:
                 items.extend(res_list)
@@ -111,32 +137,61 @@ class DeepResearcher:
             
         return items
 
+    @staticmethod
+    def _claim_minhash(text: str) -> MinHash:
+        """MinHash signature over character 3-gram shingles of a claim."""
+        mh = MinHash(num_perm=64)
+        data = text.encode("utf-8")
+        for i in range(max(len(data) - 2, 1)):
+            mh.update(data[i:i + 3])
+        return mh
+
     async def run_deep_research(self, topic: str) -> EvidenceBundle:
         print(f"🧠 Deep Research initiated for: {topic}")
         
-        # 1. Plan
-        queries = self._generate_research_plan(topic)
+        # 1. Plan — and while the planning LLM call is in flight (2-5s of
+        # pure wait), speculatively investigate the raw topic. The warmup's
+        # results merge through the same dedup below, so the overlap is free.
+        plan_task = asyncio.create_task(
+            asyncio.to_thread(self._generate_research_plan, topic)
+        )
+        warmup_task = asyncio.create_task(self._investigate_query(topic))
+
+        queries = await plan_task
         print(f"   📋 Research Plan: {queries}")
-        
+
         # 2. Execute All Queries in Parallel
         # This creates a task for every query in the plan
-        tasks = [self._investigate_query(q) for q in queries]
-        results_lists = await asyncio.gather(*tasks)
+        try:
+            tasks = [self._investigate_query(q) for q in queries]
+            results_lists = await asyncio.gather(*tasks)
+            results_lists.append(await warmup_task)
+        finally:
+            await self.search_client.close()
         
         # 3. Aggregation & Deduplication
+        # Two tiers: the exact set catches byte-identical claims cheaply,
+        # then a MinHash LSH index over 3-gram shingles catches paraphrases
+        # of the same fact (different sources word facts differently, and
+        # every surviving duplicate wastes downstream LLM tokens). LSH keeps
+        # the near-dup check O(1) average instead of N^2 comparisons.
         all_items = []
         seen_claims = set()
-        
+        lsh = MinHashLSH(threshold=0.85, num_perm=64)
+
         for result_list in results_lists:
             for item in result_list:
-                # Dedupe based on a normalized hash of the claim text
-                # Normalize: lowercase, remove simple punctuation
                 clean_claim = item.claim.lower().strip()
-                claim_hash = hashlib.md5(clean_claim.encode()).hexdigest()
-                
-                if claim_hash not in seen_claims:
-                    seen_claims.add(claim_hash)
-                    all_items.append(item)
+                claim_hash = hash(clean_claim)
+                if claim_hash in seen_claims:
+                    continue
+                seen_claims.add(claim_hash)
+
+                mh = self._claim_minhash(clean_claim)
+                if lsh.query(mh):
+                    continue  # near-duplicate of an accepted claim
+                lsh.insert(str(len(all_items)), mh)
+                all_items.append(item)
         
         print(f"✅ Deep Research Complete. Gathered {len(all_items)} unique facts.")
         
@@ -1,28 +1,173 @@
+import asyncio
+import hashlib
+import os
+import random
+import re
 import time
+from io import BytesIO
+from urllib.parse import urlsplit
+import aiohttp
+import orjson
 from ddgs import DDGS
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
+
+# More than enough HTML to fill the 15k-char text cap below; the long tail
+# of pages runs to multiple MB that would be downloaded and parsed for nothing
+MAX_HTML_BYTES = 200_000
+
+# Cleaned page text older than this is refetched
+PAGE_CACHE_TTL = 7 * 24 * 3600
+
+# DDG result lists go stale faster than page text
+SEARCH_CACHE_TTL = 24 * 3600
+
+# Boilerplate tags stripped before text extraction; built once instead of a
+# fresh list (and selector string) per fetched page
+_JUNK_TAGS = ("script", "style", "nav", "footer", "header")
+_JUNK_SELECTOR = ",".join(_JUNK_TAGS)
+
+# Any whitespace run collapses to one space during cleanup
+_WS_RE = re.compile(r'\s+')
+
+# Sent with every fetch; simple firewalls block requests' default UA
+_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
 class SearchClient:
-    def __init__(self, max_results=5):
+    def __init__(self, max_results=5, use_cache=True):
         self.max_results = max_results
         self.ddgs = DDGS()
+        # On-disk cache of CLEANED page text keyed by sha1(url): a rerun on
+        # the same topic (the usual dev loop) skips both network and parse
+        self.use_cache = use_cache
+        self.cache_dir = "output/.htmlcache"
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # DDG result lists, cached a day: dev reruns on the same topic fire
+        # the same queries, and DDG 429s aggressively
+        self.search_cache_dir = "output/.ddgcache"
+        os.makedirs(self.search_cache_dir, exist_ok=True)
+        # Pooled keep-alive session for the sync path: repeat hits on a host
+        # skip the TCP+TLS handshake, and transient 429/5xx get retried with
+        # backoff at the transport layer
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": _USER_AGENT,
+            # Explicit so brotli is offered too (requests decodes it
+            # transparently once the brotli package is installed)
+            "Accept-Encoding": "gzip, deflate, br",
+        })
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=50,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Async fetching: one shared aiohttp session (created lazily on the
+        # running loop) with a semaphore bounding in-flight page downloads
+        self._http = None
+        self._fetch_sem = asyncio.Semaphore(10)
+        # Politeness is per HOST, not global: unrelated domains fetch in
+        # parallel while repeat hits on one host space out 8-15s. The dict
+        # holds each domain's next free slot on the monotonic clock.
+        self._next_slot = {}
+        self._slot_lock = asyncio.Lock()
+
+    def _page_cache_path(self, url: str) -> str:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + ".txt")
+
+    def _page_cache_get(self, url: str):
+        """Returns cached cleaned text for a URL, or None on miss/stale."""
+        if not self.use_cache:
+            return None
+        path = self._page_cache_path(url)
+        try:
+            if time.time() - os.stat(path).st_mtime > PAGE_CACHE_TTL:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _page_cache_put(self, url: str, text: str):
+        if not self.use_cache or not text:
+            return
+        path = self._page_cache_path(url)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # cache is best-effort; never fail a fetch over it
+
+    async def _respect_domain_rate(self, url: str):
+        """Reserves a polite time slot for this URL's host and waits for it."""
+        domain = urlsplit(url).netloc
+        async with self._slot_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(domain, 0.0))
+            self._next_slot[domain] = slot + random.uniform(8, 15)
+        wait = slot - now
+        if wait > 0:
+            await asyncio.sleep(wait)
 
     def search(self, query: str):
         """
         Searches DDG and returns a list of results with metadata.
+        Results are cached on disk for a day; if DDG errors (it 429s
+        aggressively), a stale cache entry beats no results at all.
         """
         print(f"🔍 Searching for: {query}...")
+        cache_path = os.path.join(
+            self.search_cache_dir,
+            hashlib.sha1(f"{self.max_results}:{query}".encode("utf-8")).hexdigest() + ".json",
+        )
+        cached = None
+        if self.use_cache:
+            try:
+                age = time.time() - os.stat(cache_path).st_mtime
+                with open(cache_path, "rb") as f:
+                    cached = orjson.loads(f.read())
+                if age <= SEARCH_CACHE_TTL:
+                    print("   💾 Search results served from cache.")
+                    return cached
+            except (OSError, orjson.JSONDecodeError):
+                cached = None
+
         results = []
-        # DDGS.text() returns an iterator
-        ddg_gen = self.ddgs.text(query, max_results=self.max_results)
-        
-        for r in ddg_gen:
-            results.append({
-                "title": r.get("title"),
-                "href": r.get("href"),
-                "body": r.get("body") # The snippet
-            })
+        try:
+            # DDGS.text() returns an iterator
+            ddg_gen = self.ddgs.text(query, max_results=self.max_results)
+
+            for r in ddg_gen:
+                results.append({
+                    "title": r.get("title"),
+                    "href": r.get("href"),
+                    "body": r.get("body") # The snippet
+                })
+        except Exception as e:
+            if cached is not None:
+                print(f"   ⚠️ DDG search failed ({e}). Serving stale cached results.")
+                return cached
+            raise
+
+        if self.use_cache and results:
+            tmp = cache_path + ".tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(orjson.dumps(results))
+                os.replace(tmp, cache_path)
+            except OSError:
+                pass
         return results
 
     def fetch_page_text(self, url: str) -> str:
@@ -31,32 +176,118 @@ class SearchClient:
         Includes a user-agent to avoid being blocked by simple firewalls.
         Includes rate limiting to prevent 429 errors.
         """
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        cached = self._page_cache_get(url)
+        if cached is not None:
+            print(f"💾 Page served from cache: {url}")
+            return cached
+
         try:
             # Rate limiting: wait 2 seconds between requests
             time.sleep(2)
-            
+
             print(f"🌐 Fetching content from: {url}")
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, timeout=10, stream=True)
             response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove scripts, styles, and navigation to clean up text
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.extract()
-                
-            text = soup.get_text(separator=' ')
-            
-            # Simple whitespace cleanup
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            clean_text = '\n'.join(chunk for chunk in chunks if chunk)
-            
-            return clean_text[:15000] # Cap at 15k chars to save tokens
-            
+
+            # Stream with an early cap instead of reading whole bodies
+            buf = BytesIO()
+            for chunk in response.iter_content(chunk_size=8192):
+                buf.write(chunk)
+                if buf.tell() >= MAX_HTML_BYTES:
+                    response.close()
+                    break
+
+            clean_text = self._clean_text(self._extract_text(buf.getvalue()))
+            self._page_cache_put(url, clean_text)
+            return clean_text
+
         except Exception as e:
             print(f"⚠️ Failed to fetch {url}: {e}")
-            return ""
\ No newline at end of file
+            return ""
+
+    async def fetch_page_text_async(self, url: str) -> str:
+        """
+        Async counterpart of fetch_page_text for callers already on the
+        event loop: downloads via the shared aiohttp session (bounded by a
+        semaphore) and hands the CPU-bound HTML parse to a worker thread so
+        the loop keeps serving other downloads.
+        """
+        headers = {
+            "User-Agent": _USER_AGENT,
+            "Accept-Encoding": "gzip, deflate, br",
+        }
+        cached = self._page_cache_get(url)
+        if cached is not None:
+            print(f"💾 Page served from cache: {url}")
+            return cached
+
+        # Wait for this host's slot before taking a download slot, so a
+        # same-domain backoff never blocks an unrelated fetch
+        await self._respect_domain_rate(url)
+        async with self._fetch_sem:
+            try:
+                print(f"🌐 Fetching content from: {url}")
+                if self._http is None or self._http.closed:
+                    self._http = aiohttp.ClientSession(
+                        timeout=aiohttp.ClientTimeout(total=10)
+                    )
+                async with self._http.get(url, headers=headers) as response:
+                    response.raise_for_status()
+                    buf = BytesIO()
+                    async for chunk in response.content.iter_chunked(8192):
+                        buf.write(chunk)
+                        if buf.tell() >= MAX_HTML_BYTES:
+                            break
+
+                text = await asyncio.to_thread(self._extract_text, buf.getvalue())
+                clean_text = self._clean_text(text)
+                self._page_cache_put(url, clean_text)
+                return clean_text
+
+            except Exception as e:
+                print(f"⚠️ Failed to fetch {url}: {e}")
+                return ""
+
+    async def fetch_many(self, urls) -> list:
+        """
+        Fetches a batch of URLs concurrently (semaphore keeps it bounded).
+        Returns one text per URL, in order; failures come back as "".
+        """
+        results = await asyncio.gather(
+            *[self.fetch_page_text_async(u) for u in urls],
+            return_exceptions=True,
+        )
+        return [r if isinstance(r, str) else "" for r in results]
+
+    async def close(self):
+        """Closes the shared aiohttp session, if one was ever opened."""
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+
+    @staticmethod
+    def _clean_text(text: str) -> str:
+        # One C-level regex pass collapses all whitespace runs; input is
+        # already bounded by the 200 KB download cap, so a single sub is
+        # cheaper than any Python-level line/phrase loop
+        return _WS_RE.sub(' ', text).strip()[:15000] # Cap at 15k chars to save tokens
+
+    @staticmethod
+    def _extract_text(html: bytes) -> str:
+        """
+        Strips boilerplate tags and returns the page text.
+        selectolax's Lexbor engine does the whole strip-and-collect pass in
+        C; BeautifulSoup+lxml stays as the fallback for documents Lexbor
+        can't make sense of (no <body> recovered).
+        """
+        tree = LexborHTMLParser(html)
+        if tree.body is not None:
+            for node in tree.css(_JUNK_SELECTOR):
+                node.decompose()
+            return tree.body.text(separator=' ')
+
+        soup = BeautifulSoup(html, 'lxml')
+        # One find_all pass; decompose drops the subtree instead of
+        # detaching and keeping it alive the way extract does
+        for tag in soup.find_all(_JUNK_TAGS):
+            tag.decompose()
+        return soup.get_text(separator=' ')
\ No newline at end of file
@@ -1,62 +1,81 @@
-from urllib.parse import urlparse
-from typing import Optional
-from core.schemas import SourceType
-from core.config import Config
-
-def extract_domain(url: str) -> str:
-    """
-    Extracts the base domain from a URL, stripping 'www.'
-    Example: 'https://news.bbc.co.uk/story' -> 'bbc.co.uk'
-    """
-    try:
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        
-        # Remove port number if present (e.g., :8080)
-        if ':' in domain:
-            domain = domain.split(':')[0]
-            
-        # Remove 'www.' prefix
-        if domain.startswith("www."):
-            domain = domain[4:]
-            
-        return domain
-    except Exception:
-        return ""
-
-def assess_source_credibility(url: str) -> Optional[SourceType]:
-    """
-    Determines if a URL is a trusted source based on TLDs and Config allow-lists.
-    Returns the SourceType if trusted, otherwise None.
-    """
-    # 1. Automatic Trust: Government & Education TLDs
-    # We trust these regardless of the specific domain name
-    if any(url.endswith(tld) for tld in ['.gov', '.edu', '.mil', '.gov.in', '.ac.uk']):
-        if '.edu' in url or '.ac.' in url:
-            return SourceType.EDUCATION
-        return SourceType.GOVERNMENT
-    
-    # 2. Extract Domain for list matching
-    domain = extract_domain(url)
-    if not domain:
-        return None
-    
-    # 3. Check Config Allow-lists
-    
-    # Check Encyclopedia
-    if domain in Config.TRUSTED_ENCYCLOPEDIAS:
-        return SourceType.WIKIPEDIA
-        
-    # Check Major News
-    if domain in Config.TRUSTED_NEWS_DOMAINS:
-        return SourceType.NEWS_MAJOR
-        
-    # Check Tech/Science (Mapped to 'trusted' or 'news' depending on your preference)
-    # Here we map them to NEWS_MAJOR or create a new OTHER_TRUSTED type if you prefer
-    if domain in Config.TRUSTED_TECH_SCIENCE:
-        return SourceType.OTHER_TRUSTED
-
-    # 4. Strict Rejection
-    # If it's not on the list, it's out. 
-    # (This prevents blogs, social media, and content farms from entering)
-    return None
\ No newline at end of file
+from functools import lru_cache
+from urllib.parse import urlparse
+from typing import Optional
+from core.schemas import SourceType
+from core.config import match_trusted_domain
+
+# Trie category -> schema SourceType
+_CATEGORY_TO_TYPE = {
+    "encyclopedia": SourceType.WIKIPEDIA,
+    "news": SourceType.NEWS_MAJOR,
+    "tech_science": SourceType.OTHER_TRUSTED,
+}
+
+# Auto-trusted public suffixes, matched against the parsed HOSTNAME's label
+# suffix (never the raw URL, where substring checks mishit e.g. 'medu.com'
+# or any path that happens to contain '.gov')
+_TRUSTED_TLDS = {
+    "gov": SourceType.GOVERNMENT,
+    "mil": SourceType.GOVERNMENT,
+    "gov.in": SourceType.GOVERNMENT,
+    "edu": SourceType.EDUCATION,
+    "ac.uk": SourceType.EDUCATION,
+}
+
+def extract_domain(url: str) -> str:
+    """
+    Extracts the base domain from a URL, stripping 'www.'
+    Example: 'https://news.bbc.co.uk/story' -> 'bbc.co.uk'
+    """
+    try:
+        parsed = urlparse(url)
+        domain = parsed.netloc.lower()
+        
+        # Remove port number if present (e.g., :8080)
+        if ':' in domain:
+            domain = domain.split(':')[0]
+            
+        # Remove 'www.' prefix
+        if domain.startswith("www."):
+            domain = domain[4:]
+            
+        return domain
+    except Exception:
+        return ""
+
+@lru_cache(maxsize=4096)
+def _classify_domain(domain: str) -> Optional[SourceType]:
+    """
+    Classifies a bare domain. Pure given the Config allow-lists, and the
+    same domains recur across every query of a run, so the verdict is
+    memoized per domain (stable, low-cardinality key -- unlike full URLs).
+    """
+    # 1. Automatic Trust: Government & Education TLDs
+    # We trust these regardless of the specific domain name. Two dict
+    # lookups (2-label suffix, then 1-label) instead of endswith passes.
+    labels = domain.rsplit('.', 2)
+    tld_type = _TRUSTED_TLDS.get('.'.join(labels[-2:])) or _TRUSTED_TLDS.get(labels[-1])
+    if tld_type is not None:
+        return tld_type
+
+    # 2. Check Allow-list Trie
+    # One O(labels) walk covers all three lists and matches subdomains
+    # (e.g. 'news.bbc.co.uk' is trusted because 'bbc.co.uk' is listed)
+    category = match_trusted_domain(domain)
+    if category:
+        return _CATEGORY_TO_TYPE.get(category, SourceType.OTHER_TRUSTED)
+
+    # 3. Strict Rejection
+    # If it's not on the list, it's out.
+    # (This prevents blogs, social media, and content farms from entering)
+    return None
+
+def assess_source_credibility(url: str) -> Optional[SourceType]:
+    """
+    Determines if a URL is a trusted source based on TLDs and Config allow-lists.
+    Returns the SourceType if trusted, otherwise None.
+    """
+    domain = extract_domain(url)
+    if not domain:
+        return None
+    return _classify_domain(domain)
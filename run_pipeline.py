@@ -1,8 +1,9 @@
 import argparse
+import mmap
 import os
-import json
 import time
 import asyncio
+import orjson
 
 # --- IMPORTS ---
 from research.deep_research import DeepResearcher
@@ -14,25 +15,51 @@ from media.video_editor import run_video_assembly
 from packaging_module.metadata_generator import MetadataGenerator
 from core.schemas import FullScript, EvidenceBundle
 
+# fdatasync skips the metadata flush when only file data changed; Windows
+# has no fdatasync, so fall back to full fsync there
+_fsync = getattr(os, "fdatasync", os.fsync)
+
+# Topic -> filename sanitization in one pass (spaces and the chars Windows
+# rejects in filenames)
+_SANITIZE = str.maketrans({' ': '_', ':': '-', '?': '', '/': '-', '\\': '-', '|': '-'})
+
+# --- HELPER: LOAD A CACHED PYDANTIC MODEL ---
+def _load_model(filepath, model_cls):
+    """
+    Parses a cached JSON checkpoint straight off an mmap of the file —
+    orjson reads the OS page cache with no extra bytes copy — and validates
+    via model_validate, which skips __init__ keyword dispatch.
+    """
+    with open(filepath, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(mm)
+        try:
+            return model_cls.model_validate(orjson.loads(mv))
+        finally:
+            mv.release()
+            mm.close()
+
 # --- HELPER: CHECK IF FILE IS VALID ---
 def is_valid_file(filepath):
     """Returns True if file exists and is NOT empty (0 bytes)."""
-    if os.path.exists(filepath):
-        if os.path.getsize(filepath) > 100: # Needs to be bigger than empty JSON {}
-            return True
-        else:
-            print(f"      ⚠️ Found corrupt/empty file: {filepath}. Deleting...")
-            try:
-                os.remove(filepath)
-            except OSError:
-                print(f"      ❌ Could not delete {filepath}. Please delete manually.")
-            return False
+    # Single stat: exists+getsize was two syscalls and a TOCTOU window
+    try:
+        st = os.stat(filepath)
+    except FileNotFoundError:
+        return False
+    if st.st_size > 100: # Needs to be bigger than empty JSON {}
+        return True
+    print(f"      ⚠️ Found corrupt/empty file: {filepath}. Deleting...")
+    try:
+        os.remove(filepath)
+    except OSError:
+        print(f"      ❌ Could not delete {filepath}. Please delete manually.")
     return False
 
-async def run_full_pipeline(topic: str, force: bool = False):
+async def run_full_pipeline(topic: str, force: bool = False, use_cache: bool = True):
     start_time = time.time()
     # Sanitize filename: replace spaces and remove/replace invalid Windows filename chars
-    safe_topic = topic.replace(' ', '_').replace(':', '-').replace('?', '').replace('/', '-').replace('\\', '-').replace('|', '-')
+    safe_topic = topic.translate(_SANITIZE)
     print(f"\n🚀 STARTING PIPELINE: '{topic}'\n" + "="*50)
 
     # --- 1. RESEARCH PHASE (ASYNC) ---
@@ -41,11 +68,10 @@ async def run_full_pipeline(topic: str, force: bool = False):
 
     if is_valid_file(evidence_path) and not force:
         print(f"\n🔍 PHASE 1: Research (SKIPPING - Found Valid Cache)")
-        with open(evidence_path, "r", encoding="utf-8") as f:
-            evidence = EvidenceBundle(**json.load(f))
+        evidence = _load_model(evidence_path, EvidenceBundle)
     else:
         print("\n🔍 PHASE 1: Deep Research (GENERATING...)")
-        researcher = DeepResearcher()
+        researcher = DeepResearcher(use_cache=use_cache)
         
         # CRITICAL FIX: We MUST await this because deep_research.py is async
         evidence = await researcher.run_deep_research(topic) 
@@ -54,11 +80,12 @@ async def run_full_pipeline(topic: str, force: bool = False):
         if not evidence or not evidence.items:
              raise ValueError("Research returned no evidence. Check API keys or internet connection.")
 
-        json_data = evidence.model_dump_json(indent=2)
-        with open(evidence_path, "w", encoding="utf-8") as f:
+        # orjson serializes in C; mode="json" keeps datetimes/enums JSON-safe
+        json_data = orjson.dumps(evidence.model_dump(mode="json"), option=orjson.OPT_INDENT_2)
+        with open(evidence_path, "wb") as f:
             f.write(json_data)
             f.flush()
-            os.fsync(f.fileno())
+            _fsync(f.fileno())
         
         # Verify file was written correctly
         file_size = os.path.getsize(evidence_path)
@@ -72,19 +99,18 @@ async def run_full_pipeline(topic: str, force: bool = False):
 
     if is_valid_file(script_path) and not force:
         print(f"\n✍️  PHASE 2: Script (SKIPPING - Found Valid Cache)")
-        with open(script_path, "r", encoding="utf-8") as f:
-            script = FullScript(**json.load(f))
+        script = _load_model(script_path, FullScript)
     else:
         print("\n✍️  PHASE 2: Script Generation (GENERATING...)")
         writer = ScriptWriter()
         # ScriptWriter is synchronous, so NO await
         script = writer.generate_script(evidence)
         
-        json_data = script.model_dump_json(indent=2)
-        with open(script_path, "w", encoding="utf-8") as f:
+        json_data = orjson.dumps(script.model_dump(mode="json"), option=orjson.OPT_INDENT_2)
+        with open(script_path, "wb") as f:
             f.write(json_data)
             f.flush()
-            os.fsync(f.fileno())
+            _fsync(f.fileno())
         
         # Verify file was written correctly
         file_size = os.path.getsize(script_path)
@@ -99,24 +125,25 @@ async def run_full_pipeline(topic: str, force: bool = False):
     if force and os.path.exists(plan_path):
         os.remove(plan_path)
 
-    print("\n🎬 PHASE 3: Visual Direction")
+    print("\n🎬 PHASE 3-5: Visual Direction, Audio & Assets (CONCURRENT)")
     director = VisualDirector()
-    
-    # FIX: Pass the path to the director so it can handle Resume/Saving internally
-    visual_plan_objs = director.plan_visuals(script, plan_path)
-    
-    # Convert back to list of dicts for the Asset Manager
-    visual_plan = [s.model_dump() for s in visual_plan_objs]
 
-    # --- 4. AUDIO PRODUCTION (ASYNC) ---
-    print("\n🎙️  PHASE 4: Audio Production (EdgeTTS)")
-    # run_tts is async, so WE AWAIT
-    await run_tts(script)
+    # Planning -> asset gathering is a real dependency chain, but the whole
+    # chain is independent of TTS: both only read `script` and write
+    # disjoint artifacts. So the chain runs as one task (each sync stage in
+    # a worker thread, keeping its internal resume/checkpoint logic) while
+    # the network-bound EdgeTTS drives the event loop alongside it.
+    async def _visuals_and_assets():
+        visual_plan_objs = await asyncio.to_thread(director.plan_visuals, script, plan_path)
+
+        # Convert back to list of dicts for the Asset Manager
+        visual_plan = [s.model_dump() for s in visual_plan_objs]
 
-    # --- 5. ASSET GATHERING (SYNC) ---
-    print("\n🎨 PHASE 5: Asset Gathering")
-    asset_manager = AssetManager()
-    asset_manager.fetch_assets(visual_plan)
+        print("\n🎨 PHASE 5: Asset Gathering")
+        asset_manager = AssetManager()
+        await asyncio.to_thread(asset_manager.fetch_assets, visual_plan)
+
+    await asyncio.gather(_visuals_and_assets(), run_tts(script))
 
     # --- 6. VIDEO ASSEMBLY (SYNC) ---
     print("\n🎞️  PHASE 6: GPU Video Assembly")
@@ -137,11 +164,12 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the full Text-to-Video Pipeline")
     parser.add_argument("topic", type=str, help="The topic of the video")
     parser.add_argument("--force", action="store_true", help="Overwrite existing files")
-    
+    parser.add_argument("--no-cache", action="store_true", help="Skip the on-disk page cache and refetch everything")
+
     args = parser.parse_args()
-    
+
     try:
-        asyncio.run(run_full_pipeline(args.topic, force=args.force))
+        asyncio.run(run_full_pipeline(args.topic, force=args.force, use_cache=not args.no_cache))
     except KeyboardInterrupt:
         print("\n🛑 Pipeline stopped by user.")
     except Exception as e: